@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable
+
+_MISSING = object()
+
+class TTLCache:
+    """TTL 만료와 LRU 제거를 지원하는 스레드 안전 캐시
+
+    같은 키에 대한 동시 미스는 하나의 로더 호출을 공유합니다 (single-flight).
+    비동기 로더는 aget_or_load를 사용합니다.
+    version은 값을 넣거나 지울 때마다 1씩 늘어나므로, 캐시 내용이 바뀌었는지 싸게 확인할 수 있습니다.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, Future] = {}
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return _MISSING
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys) -> dict:
+        """캐시에 있는 키만 골라 돌려줌 (히트/미스 통계에 반영)"""
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._lookup(key)
+                if value is _MISSING:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    found[key] = value
+        return found
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            self.version += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+            self.version += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.version += 1
+
+    def get_or_load(self, key, loader: Callable[[], Any], ttl: float | Callable[[Any], float | None] | None = None):
+        """ttl에 함수를 넘기면 로드된 값에 따라 TTL을 정합니다 (None이면 기본 TTL)"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            self.set(key, value, ttl(value) if callable(ttl) else ttl)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_load(self, key, loader: Callable[[], Awaitable[Any]], ttl: float | Callable[[Any], float] | None = None):
+        """ttl에 함수를 넘기면 로드된 값에 따라 TTL을 정합니다 (예: 빈 결과는 짧게)"""
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+            self.misses += 1
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(self._aload(key, loader, ttl))
+
+        # 대기 중인 요청 하나가 취소되어도 공유 로드는 계속되도록 shield
+        return await asyncio.shield(task)
+
+    async def _aload(self, key, loader, ttl):
+        try:
+            value = await loader()
+            self.set(key, value, ttl(value) if callable(ttl) else ttl)
+            return value
+        finally:
+            with self._lock:
+                self._tasks.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        total = self.hits + self.misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,157 @@
+import asyncio
+import os
+import time
+from collections import deque
+from datetime import date, datetime, timedelta
+from itertools import islice
+from typing import Optional
+
+from bson import ObjectId
+
+from app.libs.database import async_db, mongo
+from app.libs.metrics import registry
+
+def _to_millis(value: datetime) -> datetime:
+    # Mongo는 밀리초까지만 저장하므로 캐시도 같은 정밀도로 맞춤
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+class CommentCache:
+    """오늘 댓글을 표시 순서(최신순)로 보관하는 프로세스 로컬 캐시
+
+    mode
+    - local: 쓰기는 이 프로세스에서만 일어난다고 보고 캐시만으로 응답 (단일 워커)
+    - versioned: Mongo의 날짜별 버전 문서를 version_ttl마다 조회해 다른 워커의 쓰기가 있으면 다시 로드 (멀티 워커)
+    - off: 항상 Mongo에서 조회
+    """
+
+    def __init__(self, db: async_db, mode: str = "versioned", maxlen: int = 2000, version_ttl: float = 1.0):
+        self.db = db
+        self.mode = mode
+        self.maxlen = maxlen
+        self.version_ttl = version_ttl
+        self.day: Optional[date] = None
+        self.version = 0
+        self.complete = False
+        # 버전 문서로 최신임을 마지막으로 확인한 시각 (monotonic)
+        self._checked_at = float("-inf")
+        self._comments: deque[dict] = deque()
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("local", "versioned")
+
+    async def _current_version(self, day: date) -> int:
+        doc = await self.db.find_one("comment_versions", {"_id": day.isoformat()})
+        return doc["version"] if doc else 0
+
+    def _is_fresh(self, today: date) -> bool:
+        """Mongo를 조회하지 않고도 최신이라고 볼 수 있으면 True"""
+        return self.day == today and (self.mode != "versioned" or time.monotonic() - self._checked_at < self.version_ttl)
+
+    async def _is_stale(self, today: date) -> bool:
+        if self.day != today:
+            return True
+        if self._is_fresh(today):
+            return False
+        # 다른 워커의 쓰기는 최대 version_ttl 늦게 반영됨
+        checked_at = time.monotonic()
+        if await self._current_version(today) != self.version:
+            return True
+        self._checked_at = checked_at
+        return False
+
+    async def _load(self, today: date):
+        start_of_day = datetime(today.year, today.month, today.day)
+        version = await self._current_version(today) if self.mode == "versioned" else 0
+        comments = self.db.find("comments", {"date": {"$gte": start_of_day, "$lt": start_of_day + timedelta(days=1)}})
+        comments = await self.db.to_list(comments.sort([("date", -1), ("_id", -1)]).limit(self.maxlen + 1), length=self.maxlen + 1)
+        self.complete = len(comments) <= self.maxlen
+        self._comments = deque(comments[:self.maxlen], maxlen=self.maxlen)
+        self.day = today
+        self.version = version
+        self._checked_at = time.monotonic()
+
+    async def load(self):
+        if not self.enabled:
+            return
+        async with self._lock:
+            await self._load(datetime.now().date())
+
+    async def _ensure_fresh(self):
+        today = datetime.now().date()
+        if self._is_fresh(today):
+            return
+        # TTL이 지나면 버전 조회는 잠금 안에서 한 요청만 하고, 기다린 요청은 그 결과(_checked_at)를 사용
+        async with self._lock:
+            if await self._is_stale(today):
+                await self._load(today)
+
+    async def page(self, page: int, page_size: int, before: Optional[tuple[datetime, ObjectId]] = None) -> Optional[list[dict]]:
+        """캐시로 응답할 수 없으면 None (Mongo에서 조회)"""
+        if not self.enabled:
+            return None
+        await self._ensure_fresh()
+
+        if before is None:
+            start = (page - 1) * page_size
+        else:
+            start = next((i for i, comment in enumerate(self._comments) if (comment["date"], comment["_id"]) < before), len(self._comments))
+
+        # 캐시가 오늘 댓글 전체를 담지 못했다면 끝부분은 Mongo에서 조회
+        if not self.complete and start + page_size > len(self._comments):
+            return None
+        return list(islice(self._comments, start, start + page_size))
+
+    async def _bump_version(self, day: date) -> bool:
+        """쓰기를 알리고, 이 캐시가 해당 날짜의 최신 상태를 이어받을 수 있으면 True"""
+        if self.mode != "versioned":
+            return self.day == day
+        doc = await self.db.find_one_and_update("comment_versions", {"_id": day.isoformat()}, {"$inc": {"version": 1}}, upsert=True)
+        if self.day == day and doc["version"] == self.version + 1:
+            self.version = doc["version"]
+            return True
+        return False
+
+    async def add(self, comment: dict):
+        if not self.enabled:
+            return
+        comment = {**comment, "date": _to_millis(comment["date"])}
+        async with self._lock:
+            if await self._bump_version(comment["date"].date()):
+                # 동시에 들어온 쓰기는 끝나는 순서가 다를 수 있으므로 Mongo 조회와 같은 (date, _id) 내림차순 위치에 넣음
+                key = (comment["date"], comment["_id"])
+                index = next((i for i, cached in enumerate(self._comments) if (cached["date"], cached["_id"]) < key), len(self._comments))
+                if index == len(self._comments) and not self.complete:
+                    return  # 캐시 범위보다 오래된 댓글은 Mongo에서 조회됨
+                if len(self._comments) == self.maxlen:
+                    self._comments.pop()
+                    self.complete = False  # 가장 오래된 댓글이 밀려남
+                self._comments.insert(min(index, len(self._comments)), comment)
+            elif self.day == comment["date"].date():
+                self.day = None  # 다른 워커의 쓰기를 놓쳤으므로 다음 조회 때 다시 로드
+
+    async def edit(self, comment_id: ObjectId, comment_date: datetime, comment: str):
+        if not self.enabled:
+            return
+        async with self._lock:
+            if not await self._bump_version(comment_date.date()):
+                if self.day == comment_date.date():
+                    self.day = None
+                return
+            for i, cached in enumerate(self._comments):
+                if cached["_id"] == comment_id:
+                    self._comments[i] = {**cached, "comment": comment, "edited": True}
+                    break
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "day": self.day, "size": len(self._comments), "complete": self.complete, "version": self.version}
+
+comment_cache = CommentCache(
+    mongo,
+    mode=os.getenv("COMMENT_CACHE_MODE", "versioned"),
+    maxlen=int(os.getenv("COMMENT_CACHE_SIZE", 2000)),
+    version_ttl=float(os.getenv("COMMENT_CACHE_VERSION_TTL", 1))
+)
+
+registry.register_status("comments", comment_cache.stats)
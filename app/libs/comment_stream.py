@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+from typing import Optional
+
+from app.libs.log import logger
+from app.libs.metrics import COMMENT_STREAM_DROPPED, COMMENT_STREAM_SUBSCRIBERS, registry
+
+class Subscriber:
+    """구독자 하나의 이벤트 큐 (가득 차면 허브가 연결을 끊음)"""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue[Optional[str]] = asyncio.Queue(maxsize=maxsize)
+
+    def close(self):
+        # 밀린 이벤트는 버리고 종료 표시(None)만 남김
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    async def next(self, timeout: float) -> Optional[str]:
+        """다음 이벤트, timeout 동안 없으면 빈 문자열, 연결이 끊겼으면 None"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return ""
+
+class LocalBackend:
+    """프로세스 안에서만 전달 (단일 워커용)"""
+
+    def __init__(self):
+        self.hub: Optional["CommentHub"] = None
+
+    async def open(self, hub: "CommentHub"):
+        self.hub = hub
+
+    async def close(self):
+        self.hub = None
+
+    async def publish(self, frame: str):
+        self.hub.dispatch(frame)
+
+class RedisBackend:
+    """Redis pub/sub으로 모든 워커의 허브에 전달 (멀티 워커용)
+
+    발행한 워커도 구독으로 자기 메시지를 받으므로 로컬로 따로 전달하지 않습니다.
+    """
+
+    def __init__(self, url: str, channel: str = "npi:comments", retry_interval: float = 1.0):
+        self.url = url
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self.hub: Optional["CommentHub"] = None
+        self._redis = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def open(self, hub: "CommentHub"):
+        from redis import asyncio as redis
+
+        self.hub = hub
+        self._redis = redis.from_url(self.url)
+        self._task = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async with self._redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.hub.dispatch(message["data"].decode("utf-8"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 연결이 끊기면 잠시 뒤 다시 구독 (그 사이의 이벤트는 유실)
+                logger.warning("comment_stream_redis_failed", extra={"error": str(e)})
+                await asyncio.sleep(self.retry_interval)
+
+    async def publish(self, frame: str):
+        await self._redis.publish(self.channel, frame)
+
+class CommentHub:
+    """새 댓글과 수정된 댓글을 SSE 구독자에게 나눠 주는 프로세스 로컬 허브
+
+    구독자마다 크기가 제한된 큐를 두고, 큐가 가득 찰 만큼 느린 구독자는 연결을 끊어
+    발행하는 쪽(댓글 작성 요청)이 느린 클라이언트를 기다리지 않게 합니다.
+    """
+
+    def __init__(self, backend, queue_size: int = 64, max_subscribers: int = 1000):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.subscribers: set[Subscriber] = set()
+        self.published = 0
+        self.dropped = 0
+
+    async def open(self):
+        await self.backend.open(self)
+
+    async def close(self):
+        await self.backend.close()
+        # 열린 스트림을 모두 끝내야 서버가 종료를 기다리지 않음
+        for subscriber in list(self.subscribers):
+            self.unsubscribe(subscriber)
+            subscriber.close()
+
+    @property
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    def subscribe(self) -> Optional[Subscriber]:
+        """구독자 수가 한도를 넘으면 None"""
+        if self.full:
+            return None
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        COMMENT_STREAM_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.discard(subscriber)
+            COMMENT_STREAM_SUBSCRIBERS.dec()
+
+    async def publish(self, event: str, comment: dict):
+        # SSE 프레임은 한 번만 만들어서 모든 워커와 구독자가 공유
+        self.published += 1
+        try:
+            await self.backend.publish(f"event: {event}\ndata: {json.dumps(comment, ensure_ascii=False)}\n\n")
+        except Exception as e:
+            # 전달 실패로 댓글 쓰기가 실패하지는 않도록 함
+            logger.warning("comment_stream_publish_failed", extra={"event": event, "error": str(e)})
+
+    def dispatch(self, frame: str):
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                self.unsubscribe(subscriber)
+                subscriber.close()
+                self.dropped += 1
+                COMMENT_STREAM_DROPPED.inc()
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, "subscribers": len(self.subscribers), "published": self.published, "dropped": self.dropped}
+
+def create_backend():
+    if os.getenv("COMMENT_STREAM_BACKEND", "memory") == "redis":
+        return RedisBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    return LocalBackend()
+
+comment_hub = CommentHub(
+    create_backend(),
+    queue_size=int(os.getenv("COMMENT_STREAM_QUEUE_SIZE", 64)),
+    max_subscribers=int(os.getenv("COMMENT_STREAM_MAX_SUBSCRIBERS", 1000))
+)
+
+registry.register_status("comment_stream", comment_hub.stats)
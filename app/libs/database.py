@@ -1,4 +1,8 @@
-from pymongo import MongoClient
+import os
+
+from pymongo import MongoClient, AsyncMongoClient, ReturnDocument
+
+from app.libs.metrics import upstream
 
 class db:
     def __init__(self, url, db_name):
@@ -27,4 +31,76 @@ class db:
         self.db[collection_name].delete_many(query)
         
     def close(self):
-        self.client.close()
\ No newline at end of file
+        self.client.close()
+
+class async_db:
+    """db와 같은 헬퍼를 제공하는 비동기 Mongo 래퍼
+
+    클라이언트는 import 시점이 아니라 FastAPI lifespan에서 open()/close() 합니다.
+    find()는 커서를 그대로 돌려주므로 sort/skip/limit 후 to_list()로 읽습니다.
+    모든 호출은 metrics의 upstream 타이머(upstream="mongo")로 기록됩니다.
+    """
+
+    def __init__(self, db_name, max_pool_size=100, min_pool_size=0):
+        self.db_name = db_name
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.client = None
+        self.db = None
+
+    def open(self, url):
+        if self.client is not None:
+            return
+        self.client = AsyncMongoClient(url, maxPoolSize=self.max_pool_size, minPoolSize=self.min_pool_size)
+        self.db = self.client[self.db_name]
+
+    async def insert(self, collection_name, data):
+        with upstream("mongo", f"{collection_name}.insert_one"):
+            return await self.db[collection_name].insert_one(data)
+
+    def find(self, collection_name, query, projection=None):
+        return self.db[collection_name].find(query, projection)
+
+    async def to_list(self, cursor, length=None):
+        with upstream("mongo", f"{cursor.collection.name}.find"):
+            return await cursor.to_list(length=length)
+
+    async def find_one(self, collection_name, query, projection=None):
+        with upstream("mongo", f"{collection_name}.find_one"):
+            return await self.db[collection_name].find_one(query, projection)
+
+    async def update(self, collection_name, query, data):
+        with upstream("mongo", f"{collection_name}.update_one"):
+            await self.db[collection_name].update_one(query, {'$set': data})
+
+    async def update_one(self, collection_name, query, data):
+        with upstream("mongo", f"{collection_name}.update_one"):
+            await self.db[collection_name].update_one(query, data)
+
+    async def find_one_and_update(self, collection_name, query, data, upsert=False):
+        with upstream("mongo", f"{collection_name}.find_one_and_update"):
+            return await self.db[collection_name].find_one_and_update(query, data, upsert=upsert, return_document=ReturnDocument.AFTER)
+
+    async def delete(self, collection_name, query):
+        with upstream("mongo", f"{collection_name}.delete_one"):
+            await self.db[collection_name].delete_one(query)
+
+    async def delete_many(self, collection_name, query):
+        with upstream("mongo", f"{collection_name}.delete_many"):
+            await self.db[collection_name].delete_many(query)
+
+    async def create_index(self, collection_name, keys, **kwargs):
+        with upstream("mongo", f"{collection_name}.create_index"):
+            return await self.db[collection_name].create_index(keys, **kwargs)
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self.db = None
+
+mongo = async_db(
+    "slunch",
+    max_pool_size=int(os.getenv("MONGODB_MAX_POOL_SIZE", 100)),
+    min_pool_size=int(os.getenv("MONGODB_MIN_POOL_SIZE", 0))
+)
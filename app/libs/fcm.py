@@ -0,0 +1,104 @@
+import itertools
+import os
+import threading
+from typing import Optional
+
+import firebase_admin
+from firebase_admin import credentials, messaging
+
+from app.libs.metrics import upstream
+
+# FCM 배치 API 한 번에 보낼 수 있는 최대 메시지/토큰 수
+MAX_BATCH_SIZE = 500
+
+def _result(target: str, success: bool, message_id: Optional[str] = None, error: Optional[str] = None) -> dict:
+    return {"target": target, "success": success, "message_id": message_id, "error": error}
+
+class FirebaseTransport:
+    """firebase_admin.messaging을 그대로 사용하는 전송 방식
+
+    Firebase 앱은 처음 보낼 때 초기화하므로, 자격 증명 파일이 없어도 서버는 시작되고
+    알림 전송만 실패합니다.
+    """
+
+    def __init__(self, credentials_path: str):
+        self.credentials_path = credentials_path
+        self._app: Optional[firebase_admin.App] = None
+        self._lock = threading.Lock()
+
+    def _get_app(self) -> firebase_admin.App:
+        if self._app is None:
+            with self._lock:
+                if self._app is None:
+                    self._app = firebase_admin.initialize_app(credentials.Certificate(self.credentials_path))
+        return self._app
+
+    def send(self, message: messaging.Message) -> str:
+        app = self._get_app()
+        with upstream("fcm", "send"):
+            return messaging.send(message, app=app)
+
+    def send_each(self, messages: list[messaging.Message]) -> list[tuple[bool, Optional[str], Optional[str]]]:
+        app = self._get_app()
+        with upstream("fcm", "send_each"):
+            response = messaging.send_each(messages, app=app)
+        return [(r.success, r.message_id, str(r.exception) if r.exception else None) for r in response.responses]
+
+    def send_each_for_multicast(self, message: messaging.MulticastMessage) -> list[tuple[bool, Optional[str], Optional[str]]]:
+        app = self._get_app()
+        with upstream("fcm", "send_each_for_multicast"):
+            response = messaging.send_each_for_multicast(message, app=app)
+        return [(r.success, r.message_id, str(r.exception) if r.exception else None) for r in response.responses]
+
+class FakeTransport:
+    """Firebase 없이 보낸 메시지를 기록만 하는 전송 방식 (로컬 개발/테스트용)
+
+    fail_tokens에 포함된 토큰은 실패로 응답합니다.
+    """
+
+    def __init__(self, fail_tokens: frozenset[str] = frozenset()):
+        self.fail_tokens = fail_tokens
+        self.sent: list = []
+        self._ids = itertools.count(1)
+
+    def _message_id(self) -> str:
+        return f"fake/messages/{next(self._ids)}"
+
+    def send(self, message: messaging.Message) -> str:
+        self.sent.append(message)
+        return self._message_id()
+
+    def send_each(self, messages: list[messaging.Message]) -> list[tuple[bool, Optional[str], Optional[str]]]:
+        self.sent.extend(messages)
+        return [(True, self._message_id(), None) for _ in messages]
+
+    def send_each_for_multicast(self, message: messaging.MulticastMessage) -> list[tuple[bool, Optional[str], Optional[str]]]:
+        self.sent.append(message)
+        return [(False, None, "Requested entity was not found.") if token in self.fail_tokens else (True, self._message_id(), None) for token in message.tokens]
+
+def dispatch(transport, data: dict, topics: list[str], tokens: list[str]) -> list[dict]:
+    """하나의 알림을 여러 토픽/토큰에 배치 API로 전송하고 대상별 결과를 돌려줌 (동기, 스레드에서 호출)"""
+    results = []
+
+    for chunk in (topics[i:i + MAX_BATCH_SIZE] for i in range(0, len(topics), MAX_BATCH_SIZE)):
+        try:
+            responses = transport.send_each([messaging.Message(data=data, topic=topic) for topic in chunk])
+            results += [_result(f"topic:{topic}", *response) for topic, response in zip(chunk, responses)]
+        except Exception as e:
+            results += [_result(f"topic:{topic}", False, error=str(e)) for topic in chunk]
+
+    for chunk in (tokens[i:i + MAX_BATCH_SIZE] for i in range(0, len(tokens), MAX_BATCH_SIZE)):
+        try:
+            responses = transport.send_each_for_multicast(messaging.MulticastMessage(data=data, tokens=chunk))
+            results += [_result(f"token:{token}", *response) for token, response in zip(chunk, responses)]
+        except Exception as e:
+            results += [_result(f"token:{token}", False, error=str(e)) for token in chunk]
+
+    return results
+
+def create_transport():
+    if os.getenv("FCM_TRANSPORT", "firebase") == "fake":
+        return FakeTransport()
+    return FirebaseTransport(os.getenv("FIREBASE_CREDENTIALS", os.path.join("app", "firebase-admin.json")))
+
+transport = create_transport()
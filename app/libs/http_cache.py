@@ -0,0 +1,114 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Callable, Hashable, Optional, Union
+
+from app.libs.cache import TTLCache
+
+MaxAge = Union[int, Callable[[], int]]
+Version = Callable[[], Hashable]
+
+def until_midnight() -> int:
+    now = datetime.now()
+    midnight = datetime(now.year, now.month, now.day) + timedelta(days=1)
+    return max(1, int((midnight - now).total_seconds()))
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+class HTTPCacheMiddleware:
+    """읽기 전용 GET 응답에 ETag/Cache-Control을 붙이고 If-None-Match에 304로 응답하는 ASGI 미들웨어
+
+    rules는 경로 접두사별 max-age(초 또는 초를 돌려주는 함수)입니다. 가장 긴 접두사가 적용됩니다.
+
+    versions는 경로 접두사별로 데이터 계층의 버전(예: 캐시의 version)을 돌려주는 함수입니다.
+    버전이 있는 경로는 마지막으로 내려준 ETag를 그때의 버전과 함께 기억해 두었다가,
+    버전이 그대로인 동안 같은 ETag로 재검증하는 요청은 핸들러를 실행하지 않고 바로 304로 응답합니다.
+    버전이 없는 경로는 항상 핸들러를 실행하고 응답 본문의 ETag로 304 여부를 정합니다.
+
+    핸들러가 Cache-Control을 직접 붙인 응답(실패 응답, 스냅샷으로 대신한 응답의 no-cache)은
+    ETag를 붙이거나 기억하지 않고 그대로 보냅니다.
+    """
+
+    def __init__(self, app, rules: dict[str, MaxAge], versions: Optional[dict[str, Version]] = None, maxsize: int = 4096):
+        self.app = app
+        self.rules = sorted(rules.items(), key=lambda rule: len(rule[0]), reverse=True)
+        self.versions = sorted((versions or {}).items(), key=lambda rule: len(rule[0]), reverse=True)
+        self.recent = TTLCache(maxsize=maxsize, ttl=60)
+
+    @staticmethod
+    def _lookup(rules: list, path: str):
+        for prefix, value in rules:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return value
+        return None
+
+    def _max_age(self, path: str) -> Optional[int]:
+        max_age = self._lookup(self.rules, path)
+        return max_age() if callable(max_age) else max_age
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        max_age = self._max_age(scope["path"])
+        if max_age is None:
+            return await self.app(scope, receive, send)
+
+        cache_control = f"public, max-age={max_age}".encode()
+        key = (scope["path"], scope["query_string"])
+        if_none_match = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"if-none-match"), None)
+
+        # 핸들러를 실행하기 전의 버전을 기억 (실행 중에 데이터가 바뀌면 다음 요청에서 버전이 달라짐)
+        get_version = self._lookup(self.versions, scope["path"])
+        version = get_version() if get_version is not None else None
+
+        recent = self.recent.get(key) if get_version is not None else None
+        if if_none_match is not None and recent is not None and recent[1] == version and _etag_matches(if_none_match, recent[0]):
+            await send({"type": "http.response.start", "status": 304, "headers": [(b"etag", recent[0].encode()), (b"cache-control", cache_control)]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        start = None
+        chunks = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                headers = dict(message.get("headers", []))
+                # 스트리밍 응답과 200/304 이외의 응답은 건드리지 않음
+                # 핸들러가 Cache-Control을 직접 정한 응답(no-cache 등)도 그대로 보냄
+                if message["status"] not in (200, 304) or headers.get(b"content-type", b"").startswith(b"text/event-stream") or b"cache-control" in headers:
+                    start = False
+                    return await send(message)
+                if message["status"] == 304:
+                    start = False
+                    message["headers"] = [*message.get("headers", []), (b"cache-control", cache_control)]
+                    return await send(message)
+                start = message
+                return
+            if start is False:
+                return await send(message)
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = list(start.get("headers", []))
+            response_etag = next((value.decode("latin-1") for name, value in headers if name == b"etag"), None)
+            if response_etag is None:
+                response_etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                headers.append((b"etag", response_etag.encode()))
+            headers.append((b"cache-control", cache_control))
+            if get_version is not None:
+                self.recent.set(key, (response_etag, version), ttl=max_age)
+
+            if if_none_match is not None and _etag_matches(if_none_match, response_etag):
+                headers = [(name, value) for name, value in headers if name not in (b"content-length", b"content-type")]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                return await send({"type": "http.response.body", "body": b""})
+
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, buffered_send)
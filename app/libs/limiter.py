@@ -0,0 +1,171 @@
+import os
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from pymongo.errors import DuplicateKeyError
+
+from app.libs.database import async_db, mongo
+from app.libs.metrics import COMMENT_REJECTIONS, registry
+
+class MemoryBackend:
+    """프로세스 로컬 슬라이딩 윈도우 (단일 워커용)"""
+
+    def __init__(self, sweep_every: int = 1024):
+        self.sweep_every = sweep_every
+        self._hits: dict[str, deque[float]] = {}
+        self._calls = 0
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        self._hits.clear()
+
+    def _sweep(self, now: float, window: float):
+        # 윈도우가 지난 키 정리
+        for key in [key for key, hits in self._hits.items() if not hits or hits[-1] <= now - window]:
+            del self._hits[key]
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        now = time.monotonic()
+        self._calls += 1
+        if self._calls % self.sweep_every == 0:
+            self._sweep(now, window)
+
+        hits = self._hits.setdefault(key, deque())
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        if len(hits) >= limit:
+            return False
+        hits.append(now)
+        return True
+
+class RedisBackend:
+    """Redis sorted set 기반 슬라이딩 윈도우 (멀티 워커용)"""
+
+    SCRIPT = """
+    local now = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+    if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+        return 0
+    end
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    redis.call('PEXPIRE', KEYS[1], window)
+    return 1
+    """
+
+    def __init__(self, url: str, prefix: str = "npi:ratelimit:"):
+        self.url = url
+        self.prefix = prefix
+        self._redis = None
+        self._script = None
+
+    async def open(self):
+        from redis import asyncio as redis
+
+        self._redis = redis.from_url(self.url)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        now = int(time.time() * 1000)
+        allowed = await self._script(keys=[self.prefix + key], args=[now, int(window * 1000), limit, f"{now}-{uuid.uuid4().hex}"])
+        return bool(allowed)
+
+class MongoBackend:
+    """Mongo 문서 하나에 최근 limit개의 요청 시각을 보관하는 슬라이딩 윈도우 (멀티 워커용, 기본값)
+
+    조건부 upsert 한 번으로 확인과 기록을 함께 하므로 여러 워커가 동시에 요청해도 한도를 넘지 않습니다.
+    한도를 넘었으면 조건에 맞는 문서가 없어 upsert가 같은 _id로 삽입을 시도하다 DuplicateKeyError가 납니다.
+    """
+
+    def __init__(self, db: async_db, collection: str = "rate_limits"):
+        self.db = db
+        self.collection = collection
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def ensure_indexes(self):
+        # 윈도우가 지난 문서는 Mongo가 정리
+        await self.db.create_index(self.collection, [("expires_at", 1)], expireAfterSeconds=0)
+
+    async def hit(self, key: str, limit: int, window: float) -> bool:
+        now = time.time()
+        query = {"_id": key, "$or": [{f"hits.{limit - 1}": {"$exists": False}}, {"hits.0": {"$lte": now - window}}]}
+        update = {
+            "$push": {"hits": {"$each": [now], "$slice": -limit}},
+            "$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=window)}
+        }
+        try:
+            await self.db.find_one_and_update(self.collection, query, update, upsert=True)
+        except DuplicateKeyError:
+            return False
+        return True
+
+class RateLimiter:
+    def __init__(self, backend):
+        self.backend = backend
+        self.rejected: Counter[str] = Counter()
+
+    async def open(self):
+        await self.backend.open()
+
+    async def close(self):
+        await self.backend.close()
+
+    async def ensure_indexes(self):
+        # 저장소에 인덱스가 필요한 백엔드(Mongo)만
+        if hasattr(self.backend, "ensure_indexes"):
+            await self.backend.ensure_indexes()
+
+    async def allow(self, key: str, limit: int, window: float) -> bool:
+        return await self.backend.hit(key, limit, window)
+
+    def reject(self, reason: str):
+        self.rejected[reason] += 1
+        COMMENT_REJECTIONS.inc(reason=reason)
+
+    def stats(self) -> dict:
+        return {"backend": type(self.backend).__name__, "rejected": dict(self.rejected)}
+
+class BanList:
+    """blocked_uuids 컬렉션을 메모리에 올려두고 주기적으로 새로고침"""
+
+    def __init__(self, db: async_db):
+        self.db = db
+        self.uuids: frozenset[str] = frozenset()
+
+    async def refresh(self):
+        blocked = await self.db.to_list(self.db.find("blocked_uuids", {}, {"uuid": 1, "_id": 0}))
+        self.uuids = frozenset(doc["uuid"] for doc in blocked if "uuid" in doc)
+
+    def __contains__(self, uuid: Optional[str]) -> bool:
+        return uuid in self.uuids
+
+def create_backend():
+    """RATE_LIMIT_BACKEND: mongo (기본값, 워커끼리 공유), redis, memory (단일 워커 전용)"""
+    backend = os.getenv("RATE_LIMIT_BACKEND", "mongo")
+    if backend == "redis":
+        return RedisBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if backend == "memory":
+        return MemoryBackend()
+    if backend == "mongo":
+        return MongoBackend(mongo)
+    raise ValueError(f"알 수 없는 RATE_LIMIT_BACKEND: {backend}")
+
+limiter = RateLimiter(create_backend())
+ban_list = BanList(mongo)
+
+registry.register_status("limiter", limiter.stats)
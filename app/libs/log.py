@@ -0,0 +1,51 @@
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# LogRecord 기본 속성 (extra로 넘긴 필드만 골라내기 위해 사용)
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+class JSONFormatter(logging.Formatter):
+    """한 줄에 JSON 하나씩 출력 (extra로 넘긴 필드 포함)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage()
+        }
+        data.update({key: value for key, value in vars(record).items() if key not in _RESERVED})
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+logger = logging.getLogger("npi")
+_listener: Optional[QueueListener] = None
+
+def setup_logging(level: str = "INFO"):
+    """요청 처리 중에는 큐에 넣기만 하고, 실제 출력은 별도 스레드에서 처리"""
+    global _listener
+    if _listener is not None:
+        return
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JSONFormatter())
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+
+def shutdown_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
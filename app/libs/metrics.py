@@ -0,0 +1,242 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Iterable
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labelnames: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """Prometheus 텍스트 형식의 샘플 줄 목록"""
+
+    def render(self) -> str:
+        return "\n".join([f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}", *self.samples()])
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in self._values.items()]
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+        # 라벨별 [버킷별 개수..., 합계, 개수]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def time(self, **labels) -> "Timer":
+        return Timer(self, labels)
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            cumulative = 0
+            for bucket, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{bucket}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {state[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+class Timer:
+    """with 블록 실행 시간을 히스토그램에 기록 (예외가 나면 outcome=error)
+
+    async 함수 안에서도 await를 감싸서 그대로 사용할 수 있습니다.
+    """
+
+    def __init__(self, histogram: Histogram, labels: dict):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "ok" if exc_type is None else "error"
+        self.histogram.observe(time.perf_counter() - self.started, outcome=outcome, **self.labels)
+        return False
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[Metric] = []
+        self.caches: dict[str, Callable[[], dict]] = {}
+        self.statuses: dict[str, Callable[[], dict]] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def register_cache(self, name: str, stats: Callable[[], dict]):
+        # stats()는 hits, misses, size를 포함하는 dict를 돌려줘야 함
+        self.caches[name] = stats
+
+    def register_status(self, name: str, stats: Callable[[], dict]):
+        # /status에 함께 보여줄 구성 요소 (불러온 라우터의 구성 요소만 등록됨)
+        self.statuses[name] = stats
+
+    def _cache_samples(self) -> str:
+        lines = []
+        for metric, key, documentation, metric_type in (
+            ("npi_cache_hits_total", "hits", "Cache hits", "counter"),
+            ("npi_cache_misses_total", "misses", "Cache misses", "counter"),
+            ("npi_cache_hit_ratio", "hit_ratio", "Cache hit ratio since start", "gauge"),
+            ("npi_cache_entries", "size", "Entries currently cached", "gauge")
+        ):
+            lines += [f"# HELP {metric} {documentation}", f"# TYPE {metric} {metric_type}"]
+            for name, stats in self.caches.items():
+                lines.append(f'{metric}{{cache="{name}"}} {stats()[key]}')
+        return "\n".join(lines)
+
+    def render(self) -> str:
+        return "\n".join([metric.render() for metric in self.metrics] + [self._cache_samples()]) + "\n"
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram("npi_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")))
+REQUESTS_IN_FLIGHT = registry.register(Gauge("npi_http_requests_in_flight", "HTTP requests currently being served"))
+UPSTREAM_DURATION = registry.register(Histogram("npi_upstream_duration_seconds", "Upstream call latency", ("upstream", "operation", "outcome")))
+UPSTREAM_IN_FLIGHT = registry.register(Gauge("npi_upstream_in_flight", "Upstream calls currently in flight", ("upstream",)))
+SCHOOL_SEARCHES = registry.register(Counter("npi_school_search_total", "School searches by where they were answered", ("source",)))
+COMMENT_REJECTIONS = registry.register(Counter("npi_comment_rejections_total", "Rejected comment writes by reason", ("reason",)))
+COMMENT_STREAM_SUBSCRIBERS = registry.register(Gauge("npi_comment_stream_subscribers", "Open comment stream connections"))
+COMMENT_STREAM_DROPPED = registry.register(Counter("npi_comment_stream_dropped_total", "Comment stream clients dropped for falling behind"))
+
+class UpstreamTimer:
+    def __init__(self, name: str, operation: str):
+        self.name = name
+        self.timer = UPSTREAM_DURATION.time(upstream=name, operation=operation)
+
+    def __enter__(self):
+        UPSTREAM_IN_FLIGHT.inc(upstream=self.name)
+        self.timer.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        UPSTREAM_IN_FLIGHT.dec(upstream=self.name)
+        return self.timer.__exit__(exc_type, exc, tb)
+
+def upstream(name: str, operation: str) -> UpstreamTimer:
+    """업스트림 호출 시간과 동시 호출 수를 기록
+
+    with upstream("neis", "mealServiceDietInfo"):
+        ...
+    """
+    return UpstreamTimer(name, operation)
+
+def route_template(scope) -> str:
+    """요청이 매칭된 라우트의 경로 템플릿 (예: /slunch_comment/{comment_id})"""
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    path = scope["path"]
+    if route.path_regex.match(path):
+        return route.path
+    # include_router의 prefix가 라우트 경로에 포함되지 않는 FastAPI 버전 대응
+    for index in range(1, len(path) + 1):
+        if (index == len(path) or path[index] == "/") and route.path_regex.match(path[index:]):
+            return path[:index] + route.path
+    return route.path
+
+class MetricsMiddleware:
+    """라우트 템플릿 단위로 요청 지연 시간을 기록하는 ASGI 미들웨어
+
+    SSE(text/event-stream) 응답은 연결이 오래 유지되므로 지연 시간에 넣지 않고,
+    응답을 시작하면 처리 중인 요청에서도 뺍니다 (열린 연결 수는 스트림 쪽 지표로 확인).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = dict(message.get("headers", []))
+                if headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    streaming = True
+                    REQUESTS_IN_FLIGHT.dec()
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not streaming:
+                REQUESTS_IN_FLIGHT.dec()
+                REQUEST_DURATION.observe(
+                    time.perf_counter() - started,
+                    method=scope["method"],
+                    route=route_template(scope),
+                    status=status
+                )
@@ -0,0 +1,104 @@
+import asyncio
+import os
+from typing import Optional
+
+import httpx
+
+from app.libs.metrics import upstream
+
+NEIS_URL = "https://open.neis.go.kr/hub"
+# NEIS가 한 페이지에 돌려주는 최대 행 수
+MAX_PAGE_SIZE = 1000
+
+class NeisError(Exception):
+    """NEIS가 데이터 대신 RESULT를 돌려준 경우 (예: INFO-200 해당하는 데이터가 없습니다.)"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+class NeisUnavailable(Exception):
+    """재시도해도 NEIS에 연결할 수 없거나 5xx로 응답한 경우
+
+    httpx 예외 메시지에는 API 키(key=...)가 들어 있는 요청 URL이 포함되므로,
+    응답, /status, 로그로 나가는 메시지에는 상태 코드나 예외 종류만 남깁니다.
+    """
+
+class NeisClient:
+    """커넥션 풀을 공유하는 NEIS Open API 비동기 클라이언트
+
+    FastAPI lifespan에서 open()/close() 합니다.
+    동시에 보내는 요청 수는 concurrency로 제한됩니다 (여러 학교/페이지를 동시에 가져올 때).
+    """
+
+    def __init__(self, timeout: float = 5.0, retries: int = 2, max_connections: int = 20, concurrency: int = 8):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def open(self):
+        if self._client is not None:
+            return
+        self._client = httpx.AsyncClient(
+            base_url=os.getenv("NEIS_API_URL", NEIS_URL),
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, service: str, params: dict, timeout: Optional[float]) -> dict:
+        if self._client is None:
+            await self.open()
+
+        for attempt in range(self.retries + 1):
+            try:
+                async with self._semaphore:
+                    with upstream("neis", service):
+                        response = await self._client.get(f"/{service}", params=params, timeout=timeout or self.timeout)
+                if response.status_code < 500:
+                    return response.json()
+                response.raise_for_status()
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                if attempt == self.retries:
+                    detail = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+                    # 원래 예외(요청 URL 포함)는 연결하지 않음
+                    raise NeisUnavailable(f"NEIS {detail}") from None
+            await asyncio.sleep(0.2 * 2 ** attempt)
+
+    async def _page(self, service: str, params: dict, index: int, size: int, timeout: Optional[float]) -> tuple[list[dict], int]:
+        params = {"key": os.getenv("NEIS_API_KEY"), "type": "json", "pIndex": index, "pSize": size, **params}
+        data = await self._request(service, params, timeout)
+
+        if service not in data:
+            result = data.get("RESULT", {})
+            raise NeisError(result.get("CODE", ""), result.get("MESSAGE", ""))
+
+        head, body = data[service]
+        return body["row"], head["head"][0]["list_total_count"]
+
+    async def get(self, service: str, params: dict, timeout: Optional[float] = None, page_size: int = MAX_PAGE_SIZE) -> list[dict]:
+        """모든 페이지의 row를 합쳐서 돌려줌
+
+        첫 페이지의 list_total_count로 남은 페이지 수를 계산해 나머지는 동시에 요청합니다.
+        """
+        rows, total = await self._page(service, params, 1, page_size, timeout)
+        pages = -(-total // page_size)
+        if pages <= 1:
+            return rows
+
+        rest = await asyncio.gather(*[self._page(service, params, index, page_size, timeout) for index in range(2, pages + 1)])
+        return rows + [row for page_rows, _ in rest for row in page_rows]
+
+neis = NeisClient(
+    timeout=float(os.getenv("NEIS_TIMEOUT", 5)),
+    retries=int(os.getenv("NEIS_RETRIES", 2)),
+    max_connections=int(os.getenv("NEIS_MAX_CONNECTIONS", 20)),
+    concurrency=int(os.getenv("NEIS_CONCURRENCY", 8))
+)
@@ -0,0 +1,280 @@
+import asyncio
+import calendar
+import operator
+import os
+import re
+import time
+from datetime import date, datetime
+from typing import Any, Callable, NamedTuple, Optional
+
+from app.libs.cache import TTLCache
+from app.libs.neis import neis, NeisError
+from app.libs.metrics import registry
+from app.libs.snapshot import snapshots, STALE_TTL
+from app.libs.log import logger
+
+NO_DATA_CODE = "INFO-200"
+NO_DATA_MESSAGE = "해당하는 데이터가 없습니다."
+
+ALLERGY_PATTERN = re.compile(r'\s*\([^)]*\)')
+
+# 한 요청에서 조회할 수 있는 최대 기간과 학교 수
+MAX_RANGE_DAYS = 366
+MAX_SCHOOLS = int(os.getenv("NEIS_MAX_SCHOOLS", 10))
+
+class School(NamedTuple):
+    atpt_code: str  # 시도교육청코드 (ATPT_OFCDC_SC_CODE)
+    school_code: str  # 행정표준코드 (SD_SCHUL_CODE)
+
+# 선린인터넷고
+DEFAULT_SCHOOL = School("B10", "7010536")
+
+def parse_school_list(value: Optional[str]) -> list[School]:
+    # "B10:7010536,J10:7530000" 형식 (비어 있으면 선린인터넷고)
+    if not value:
+        return [DEFAULT_SCHOOL]
+    schools = []
+    for item in value.split(","):
+        atpt_code, _, school_code = item.strip().partition(":")
+        if not atpt_code or not school_code:
+            raise ValueError(f"학교 형식이 올바르지 않습니다: {item.strip()} (예: B10:7010536)")
+        schools.append(School(atpt_code.upper(), school_code))
+    schools = list(dict.fromkeys(schools))
+    if len(schools) > MAX_SCHOOLS:
+        raise ValueError(f"학교는 최대 {MAX_SCHOOLS}개까지 조회할 수 있습니다")
+    return schools
+
+def resolve_range(year: Optional[int], month: Optional[int], day: Optional[int], start: Optional[date], end: Optional[date]) -> tuple[date, date]:
+    """start/end가 있으면 그 기간, 없으면 year(기본값 올해)/month/day로 기간을 정함"""
+    if start is not None or end is not None:
+        if start is None or end is None:
+            raise ValueError("start와 end를 함께 지정해야 합니다")
+        if end < start:
+            raise ValueError("end는 start보다 빠를 수 없습니다")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise ValueError(f"기간은 최대 {MAX_RANGE_DAYS}일까지 조회할 수 있습니다")
+        return start, end
+
+    if month is None:
+        raise ValueError("month 또는 start/end를 지정해야 합니다")
+    year = year or datetime.now().year
+    if day is not None:
+        return date(year, month, day), date(year, month, day)
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+def month_range(start: date, end: date) -> list[str]:
+    # 기간에 걸친 달 목록 (YYYYMM)
+    months = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        months.append(f"{year}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+class Meal(NamedTuple):
+    date: str
+    menu: tuple[str, ...]
+
+def parse_meal(row: dict) -> Meal:
+    # 메뉴 뒤의 알레르기 정보 (1.2.5) 제거
+    return Meal(
+        date=row['MLSV_YMD'],
+        menu=tuple(ALLERGY_PATTERN.sub('', item.strip()) for item in row['DDISH_NM'].split('<br/>'))
+    )
+
+def restore_meal(row: list) -> Meal:
+    # 스냅샷(JSON)에서 복원
+    return Meal(date=row[0], menu=tuple(row[1]))
+
+class Schedule(NamedTuple):
+    date: str
+    event: str
+
+def parse_schedule(row: dict) -> Schedule:
+    return Schedule(date=row['AA_YMD'], event=row['EVENT_NM'])
+
+def restore_schedule(row: list) -> Schedule:
+    return Schedule(date=row[0], event=row[1])
+
+class MonthStore:
+    """NEIS 데이터를 (학교, 월) 단위로 메모리에 보관하는 저장소
+
+    여러 달을 조회하면 캐시에 없는 달만 모아 학교마다 기간 조회 한 번(페이지 나누기 포함)으로 가져오고,
+    다른 요청이 이미 가져오는 중인 달은 그 요청을 함께 기다립니다. NEIS의 "데이터 없음" 응답도
+    negative_ttl 동안 캐싱해 주말/방학 조회가 다시 NEIS를 호출하지 않도록 합니다.
+
+    가져온 데이터는 스냅샷(namespace)으로도 저장해 두었다가 재시작할 때 캐시를 채우고,
+    NEIS 장애 때는 스냅샷을 STALE_TTL 동안 대신 응답합니다 (stale로 표시).
+    """
+
+    def __init__(self, service: str, namespace: str, range_fields: tuple[str, str], params: dict, parse: Callable[[dict], NamedTuple], restore: Callable[[list], NamedTuple], ttl: float = 3600, negative_ttl: float = 600, maxsize: int = 1024):
+        self.service = service
+        self.namespace = namespace
+        self.range_fields = range_fields
+        self.params = params
+        self.parse = parse
+        self.restore = restore
+        self.negative_ttl = negative_ttl
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # (학교 목록, 기간) -> (원본 달 데이터, stale, 직렬화한 응답)
+        self.rendered_cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: dict[tuple[School, str], asyncio.Future] = {}
+        self._stale: set[tuple[School, str]] = set()
+
+    def _ttl(self, items: tuple) -> float:
+        return self.cache.ttl if items else self.negative_ttl
+
+    def load_snapshot(self):
+        """저장된 스냅샷 중 아직 만료되지 않은 달로 캐시를 채움 (lifespan에서 호출)"""
+        now = time.time()
+        for (atpt_code, school_code, year_month), rows, updated_at in snapshots.load(self.namespace):
+            items = tuple(self.restore(row) for row in rows)
+            remaining = self._ttl(items) - (now - updated_at)
+            if remaining > 0:
+                self.cache.set((School(atpt_code, school_code), year_month), items, remaining)
+
+    async def _fetch(self, school: School, year_months: list[str]) -> dict[str, tuple]:
+        # 첫 달 1일부터 마지막 달 말일까지 한 번에 조회한 뒤 달별로 나눠서 캐싱
+        last_year, last_month = int(year_months[-1][:4]), int(year_months[-1][4:])
+        from_field, to_field = self.range_fields
+        params = {
+            **self.params,
+            "ATPT_OFCDC_SC_CODE": school.atpt_code,
+            "SD_SCHUL_CODE": school.school_code,
+            from_field: f"{year_months[0]}01",
+            to_field: f"{year_months[-1]}{calendar.monthrange(last_year, last_month)[1]}"
+        }
+        try:
+            rows = await neis.get(self.service, params)
+        except NeisError as e:
+            if e.code != NO_DATA_CODE:
+                raise
+            rows = []
+
+        grouped: dict[str, list] = {year_month: [] for year_month in year_months}
+        for row in rows:
+            item = self.parse(row)
+            if item.date[:6] in grouped:
+                grouped[item.date[:6]].append(item)
+
+        result = {}
+        for year_month, items in grouped.items():
+            result[year_month] = tuple(items)
+            self.cache.set((school, year_month), result[year_month], self._ttl(result[year_month]))
+            self._stale.discard((school, year_month))
+            snapshots.save(self.namespace, [*school, year_month], [list(item) for item in items])
+        return result
+
+    async def _fetch_or_snapshot(self, school: School, year_months: list[str]) -> dict[str, tuple]:
+        try:
+            return await self._fetch(school, year_months)
+        except Exception as e:
+            saved = [await asyncio.to_thread(snapshots.get, self.namespace, [*school, year_month]) for year_month in year_months]
+            if any(snapshot is None for snapshot in saved):
+                raise
+            logger.warning("neis_serving_snapshot", extra={"service": self.service, "school": school.school_code, "months": year_months, "error": str(e)})
+
+        result = {}
+        for year_month, (rows, _) in zip(year_months, saved):
+            result[year_month] = tuple(self.restore(row) for row in rows)
+            self.cache.set((school, year_month), result[year_month], STALE_TTL)
+            self._stale.add((school, year_month))
+        return result
+
+    def _start_fetch(self, school: School, year_months: list[str]) -> asyncio.Future:
+        task = asyncio.ensure_future(self._fetch_or_snapshot(school, year_months))
+        keys = [(school, year_month) for year_month in year_months]
+        for key in keys:
+            self._inflight[key] = task
+
+        def done(_):
+            for key in keys:
+                if self._inflight.get(key) is task:
+                    del self._inflight[key]
+
+        task.add_done_callback(done)
+        return task
+
+    async def months(self, school: School, year_months: list[str]) -> tuple[dict[str, tuple], bool]:
+        """(달별 데이터, 스냅샷으로 대신 응답한 달이 있는지)"""
+        found = self.cache.get_many([(school, year_month) for year_month in year_months])
+        waiting: dict[str, asyncio.Future] = {}
+        missing = []
+        for year_month in year_months:
+            if (school, year_month) in found:
+                continue
+            task = self._inflight.get((school, year_month))
+            if task is None:
+                missing.append(year_month)
+            else:
+                waiting[year_month] = task
+
+        if missing:
+            task = self._start_fetch(school, missing)
+            waiting.update({year_month: task for year_month in missing})
+
+        # 대기 중인 요청 하나가 취소되어도 공유 조회는 계속되도록 shield
+        for year_month, task in waiting.items():
+            found[(school, year_month)] = (await asyncio.shield(task))[year_month]
+        stale = any((school, year_month) in self._stale for year_month in year_months)
+        return {year_month: found[(school, year_month)] for year_month in year_months}, stale
+
+    @staticmethod
+    def _select(months: dict[str, tuple], start: date, end: date) -> tuple:
+        start_date, end_date = f"{start:%Y%m%d}", f"{end:%Y%m%d}"
+        return tuple(item for items in months.values() for item in items if start_date <= item.date <= end_date)
+
+    async def _months_of(self, schools: list[School], year_months: list[str]) -> list[tuple[dict[str, tuple], bool]]:
+        # 학교별 조회는 동시에 (NEIS 동시 요청 수는 NeisClient가 제한)
+        if len(schools) == 1:
+            return [await self.months(schools[0], year_months)]
+        return await asyncio.gather(*[self.months(school, year_months) for school in schools])
+
+    async def range(self, school: School, start: date, end: date) -> tuple[tuple, bool]:
+        months, stale = await self.months(school, month_range(start, end))
+        return self._select(months, start, end), stale
+
+    async def ranges(self, schools: list[School], start: date, end: date) -> tuple[list[tuple], bool]:
+        results = await self._months_of(schools, month_range(start, end))
+        return [self._select(months, start, end) for months, _ in results], any(stale for _, stale in results)
+
+    async def rendered(self, schools: list[School], start: date, end: date, render: Callable[[list[tuple], bool], Any]) -> tuple[Any, bool]:
+        """ranges()의 결과를 render(학교별 데이터, stale)로 직렬화한 값과 stale
+
+        캐시의 달 데이터는 새로 가져올 때만 교체되므로, 조회한 달 데이터가 모두 지난번과 같은 객체면
+        지난번에 직렬화한 값을 그대로 돌려줍니다 (한 달치 목록을 요청마다 다시 직렬화하지 않도록).
+        """
+        results = await self._months_of(schools, month_range(start, end))
+        sources = tuple(items for months, _ in results for items in months.values())
+        stale = any(stale for _, stale in results)
+        key = (tuple(schools), start, end)
+
+        cached = self.rendered_cache.get(key)
+        if cached is not None and cached[1] == stale and len(cached[0]) == len(sources) and all(map(operator.is_, cached[0], sources)):
+            return cached[2], stale
+        value = render([self._select(months, start, end) for months, _ in results], stale)
+        self.rendered_cache.set(key, (sources, stale, value))
+        return value, stale
+
+    async def refresh(self, school: School, year_months: list[str]) -> dict[str, tuple]:
+        # 캐시 만료와 상관없이 새로 가져와 교체 (프리페치용)
+        return await self._fetch(school, year_months)
+
+meal_store = MonthStore(
+    "mealServiceDietInfo", "meals", ("MLSV_FROM_YMD", "MLSV_TO_YMD"),
+    {"MMEAL_SC_CODE": "2"},
+    parse_meal, restore_meal,
+    ttl=int(os.getenv("MEAL_CACHE_TTL", 3600)),
+    negative_ttl=int(os.getenv("MEAL_NEGATIVE_CACHE_TTL", 600))
+)
+
+schedule_store = MonthStore(
+    "SchoolSchedule", "schedules", ("AA_FROM_YMD", "AA_TO_YMD"),
+    {},
+    parse_schedule, restore_schedule,
+    ttl=int(os.getenv("SCHEDULE_CACHE_TTL", 21600)),
+    negative_ttl=int(os.getenv("SCHEDULE_NEGATIVE_CACHE_TTL", 3600))
+)
+
+registry.register_cache("meals", meal_store.cache.stats)
+registry.register_cache("schedules", schedule_store.cache.stats)
@@ -0,0 +1,49 @@
+import asyncio
+import os
+from datetime import date
+from typing import Callable
+
+from app.libs.scheduler import Scheduler
+
+def enabled() -> bool:
+    return os.getenv("PREFETCH_ENABLED", "true").lower() == "true"
+
+def parse_schools(value: str) -> list[tuple[str, int | None]]:
+    # "선린인터넷고,다른학교:12345" 형식 (학교 코드는 선택)
+    schools = []
+    for item in value.split(","):
+        name, _, code = item.strip().partition(":")
+        if name:
+            schools.append((name, int(code) if code else None))
+    return schools
+
+def current_and_next_month() -> list[tuple[int, int]]:
+    today = date.today()
+    if today.month == 12:
+        return [(today.year, 12), (today.year + 1, 1)]
+    return [(today.year, today.month), (today.year, today.month + 1)]
+
+def month_job(store, schools: list):
+    # store는 neis_store.MonthStore (학교마다 이번 달과 다음 달을 한 번에 새로고침)
+    async def refresh():
+        year_months = [f"{year}{month:02d}" for year, month in current_and_next_month()]
+        await asyncio.gather(*[store.refresh(school, year_months) for school in schools])
+    return refresh
+
+def timetable_job(refresh_timetable: Callable, school_name: str, school_code: int | None):
+    async def refresh():
+        # pycomcigan은 동기 라이브러리이므로 스레드에서 실행
+        await asyncio.gather(*[asyncio.to_thread(refresh_timetable, school_name, week, school_code) for week in (0, 1)])
+    return refresh
+
+# 각 라우터의 lifespan에서 자기 데이터의 프리페치 작업만 등록합니다.
+def register_meal_jobs(scheduler: Scheduler, meal_store, schools: list):
+    scheduler.add("meals", month_job(meal_store, schools), interval=int(os.getenv("PREFETCH_MEAL_INTERVAL", 1800)))
+
+def register_schedule_jobs(scheduler: Scheduler, schedule_store, schools: list):
+    scheduler.add("schedules", month_job(schedule_store, schools), interval=int(os.getenv("PREFETCH_SCHEDULE_INTERVAL", 10800)))
+
+def register_timetable_jobs(scheduler: Scheduler, refresh_timetable: Callable):
+    for school_name, school_code in parse_schools(os.getenv("PREFETCH_SCHOOLS", "선린인터넷고")):
+        name = f"timetable:{school_name}" if school_code is None else f"timetable:{school_name}:{school_code}"
+        scheduler.add(name, timetable_job(refresh_timetable, school_name, school_code), interval=int(os.getenv("PREFETCH_TIMETABLE_INTERVAL", 300)))
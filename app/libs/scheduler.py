@@ -0,0 +1,94 @@
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+class Job:
+    def __init__(self, name: str, func: Callable[[], Awaitable], interval: float, jitter: float = 0.1, max_backoff: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff or interval
+        self.runs = 0
+        self.failures = 0
+        self.last_refresh: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_run: Optional[datetime] = None
+
+    def next_delay(self) -> float:
+        if self.failures:
+            # 업스트림 오류 시 지수 백오프 (최대 max_backoff)
+            delay = min(self.max_backoff, 5 * 2 ** (self.failures - 1))
+        else:
+            delay = self.interval
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_refresh": self.last_refresh,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "next_run": self.next_run
+        }
+
+class Scheduler:
+    """주기적으로 업스트림 데이터를 미리 가져오는 asyncio 기반 스케줄러
+
+    FastAPI lifespan에서 start()/stop() 합니다.
+    """
+
+    def __init__(self):
+        self.jobs: dict[str, Job] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add(self, name: str, func: Callable[[], Awaitable], interval: float, jitter: float = 0.1):
+        self.jobs[name] = Job(name, func, interval, jitter)
+
+    async def _run(self, job: Job):
+        # 여러 워커가 동시에 시작해도 업스트림에 몰리지 않도록 첫 실행도 살짝 분산
+        delay = random.uniform(0, min(5.0, job.interval * job.jitter))
+        while True:
+            job.next_run = datetime.fromtimestamp(time.time() + delay)
+            await asyncio.sleep(delay)
+
+            started = time.perf_counter()
+            try:
+                await job.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                job.failures += 1
+                job.last_error = f"{type(e).__name__}: {e}"
+            else:
+                job.failures = 0
+                job.last_error = None
+                job.last_refresh = datetime.now()
+            job.runs += 1
+            job.last_duration = time.perf_counter() - started
+            # 취소를 삼키는 호출(예: 서버 선택 중인 pymongo)이 있어도 stop()이 끝나도록 다시 취소
+            if asyncio.current_task().cancelling():
+                raise asyncio.CancelledError
+            delay = job.next_delay()
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._run(job), name=f"prefetch:{job.name}") for job in self.jobs.values()]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def status(self) -> list[dict]:
+        return [job.status() for job in self.jobs.values()]
+
+scheduler = Scheduler()
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSUNG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ", "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 입력 중에 나오는 겹자음/겹모음도 낱자로 풀어서 비교
+COMPOUND_JAMO = {
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ"
+}
+HANGUL_START, HANGUL_END = 0xAC00, 0xD7A3
+
+def decompose(text: str) -> str:
+    """한글 음절을 자모 단위로 분해 (예: 선린 -> ㅅㅓㄴㄹㅣㄴ)"""
+    result = []
+    for char in text:
+        code = ord(char)
+        if HANGUL_START <= code <= HANGUL_END:
+            code -= HANGUL_START
+            result.append(CHOSUNG[code // 588])
+            result.append(COMPOUND_JAMO.get(JUNGSUNG[code % 588 // 28], JUNGSUNG[code % 588 // 28]))
+            result.append(JONGSUNG[code % 28])
+        else:
+            result.append(COMPOUND_JAMO.get(char, char))
+    return "".join(result)
+
+def initials(text: str) -> str:
+    """한글 음절을 초성으로 변환 (예: 선린인터넷고 -> ㅅㄹㅇㅌㄴㄱ)"""
+    return "".join(CHOSUNG[(ord(char) - HANGUL_START) // 588] if HANGUL_START <= ord(char) <= HANGUL_END else char for char in text)
+
+def has_jamo(text: str) -> bool:
+    # 완성되지 않은 자모(ㄱ~ㅣ)가 섞인 검색어는 컴시간에 보낼 수 없음
+    return any(0x3131 <= ord(char) <= 0x318E for char in text)
+
+def split_composing(text: str) -> tuple[str, str]:
+    """끝에 붙은 입력 중인 자모를 떼어 냄 (예: 선린ㅇ -> ("선린", "ㅇ"))"""
+    end = len(text)
+    while end and has_jamo(text[end - 1]):
+        end -= 1
+    return text[:end], decompose(text[end:])
+
+def normalize(text: str) -> str:
+    return "".join(text.split()).lower()
+
+class SchoolIndex:
+    """컴시간 학교 검색 결과를 모아 둔 로컬 검색 인덱스
+
+    컴시간 검색은 부분 문자열 검색이므로, 이미 컴시간에 물어본 검색어를 포함하는
+    검색어는 로컬 인덱스만으로 응답할 수 있습니다. 인덱스는 JSON 파일로 저장되며,
+    검색마다 파일을 다시 쓰지 않도록 merge는 메모리만 바꾸고 flush()가 모아서 저장합니다.
+    """
+
+    def __init__(self, path: str, query_ttl: float = 30 * 86400):
+        self.path = path
+        self.query_ttl = query_ttl
+        self._schools: dict[tuple[int, int], tuple[list, str, str, str]] = {}
+        self._queries: dict[str, float] = {}
+        self._loaded = False
+        self._dirty = False
+        # merge로 인덱스가 바뀔 때마다 늘어남 (HTTP 캐시의 재검증용)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def _add(self, school: list):
+        # 코드가 0인 행은 학교가 아니라 "검색결과가 많습니다" 같은 안내 행
+        if school[0] == 0:
+            return
+        name = normalize(school[2])
+        self._schools[(school[0], school[3])] = (school, name, tuple(decompose(char) for char in name), initials(name))
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for school in data.get("schools", []):
+            self._add(school)
+        self._queries = data.get("queries", {})
+
+    def _save(self):
+        data = {"schools": [entry[0] for entry in self._schools.values()], "queries": self._queries}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _covered(self, query: str) -> bool:
+        # 검색어의 부분 문자열 중 이미 컴시간에 물어본 것이 있으면 결과가 인덱스에 모두 있음
+        now = time.time()
+        return any(
+            now - self._queries.get(query[start:end], -self.query_ttl) < self.query_ttl
+            for start in range(len(query))
+            for end in range(start + 1, len(query) + 1)
+        )
+
+    @staticmethod
+    def _find(name: str, syllables: tuple[str, ...], head: str, tail: str) -> int:
+        """검색어가 학교 이름에서 시작하는 위치 (없으면 -1)
+
+        입력 중인 자모(tail)는 완성된 부분(head) 바로 뒤 음절부터 자모 단위로 비교하고,
+        완성된 음절은 음절 단위로만 비교해 음절 경계를 넘는 잘못된 일치를 막습니다.
+        """
+        start = name.find(head)
+        while start != -1:
+            if not tail or "".join(syllables[start + len(head):]).startswith(tail):
+                return start
+            start = name.find(head, start + 1)
+        return -1
+
+    def _match(self, query: str) -> list[list]:
+        head, tail = split_composing(query)
+        chosung_only = all(char in CHOSUNG for char in query)
+        prefix, substring = [], []
+        for school, name, syllables, name_initials in self._schools.values():
+            position = self._find(name, syllables, head, tail)
+            if position == 0 or (chosung_only and name_initials.startswith(query)):
+                prefix.append(school)
+            elif position > 0 or (chosung_only and query in name_initials):
+                substring.append(school)
+        return sorted(prefix, key=lambda school: school[2]) + sorted(substring, key=lambda school: school[2])
+
+    def search(self, query: str) -> Optional[list[list]]:
+        """로컬 인덱스만으로 응답할 수 없으면 None"""
+        query = normalize(query)
+        with self._lock:
+            self._load()
+            if not has_jamo(query) and not self._covered(query):
+                return None
+            return self._match(query)
+
+    def merge(self, query: str, schools: list[list]):
+        with self._lock:
+            self._load()
+            for school in schools:
+                self._add(school)
+            # 결과가 너무 많아 잘린 검색어는 인덱스에 결과가 모두 있는 것이 아니므로 기록하지 않음
+            if all(school[0] != 0 for school in schools):
+                self._queries[normalize(query)] = time.time()
+            self._dirty = True
+            self.version += 1
+
+    def flush(self):
+        """merge 이후 바뀐 내용이 있으면 파일에 저장 (실패하면 다음 flush에서 다시 시도)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self._save()
+            except OSError:
+                return
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._schools)
+
+school_index = SchoolIndex(
+    os.getenv("SCHOOL_INDEX_PATH", os.path.join("app", "school_index.json")),
+    query_ttl=int(os.getenv("SCHOOL_INDEX_QUERY_TTL", 30 * 86400))
+)
@@ -0,0 +1,29 @@
+import json
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 (출력은 같음)
+    orjson = None
+
+def dumps(content: Any) -> bytes:
+    """JSON 바이트 (FastAPI 기본 응답과 같은 형식: 공백 없음, 한글 그대로)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """검증 없이 바로 직렬화하는 JSON 응답 (bytes를 넘기면 그대로 보냄)
+
+    라우터가 이 응답을 돌려주면 FastAPI는 반환 타입 검증과 jsonable_encoder를 건너뜁니다.
+    반환 타입 주석은 그대로 두어 OpenAPI 스키마는 바뀌지 않습니다.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
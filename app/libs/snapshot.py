@@ -0,0 +1,142 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+from app.libs.log import logger
+
+class SnapshotStore:
+    """파싱한 업스트림 데이터(급식, 학사일정, 시간표)를 SQLite에 보관하는 스냅샷 저장소
+
+    재시작 직후 캐시를 채우고, 업스트림 장애 때 마지막으로 받은 데이터를 응답하는 데 사용합니다.
+    쓰기는 큐에 넣기만 하고 별도 스레드에서 모아서 커밋하므로 요청 처리를 막지 않습니다.
+    키와 값은 JSON으로 직렬화할 수 있어야 합니다.
+
+    키는 요청한 학교 목록/이름에서 오므로, 열 때와 prune_interval마다 max_age보다 오래된 행과
+    네임스페이스별로 최근 max_rows개를 넘는 행을 지웁니다.
+    """
+
+    def __init__(self, path: str, max_age: float = 30 * 86400, max_rows: int = 10000, prune_interval: float = 3600):
+        self.path = path
+        self.max_age = max_age
+        self.max_rows = max_rows
+        self.prune_interval = prune_interval
+        self._pruned_at = float("-inf")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._users = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._conn is not None
+
+    @staticmethod
+    def _encode(value) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+    def open(self):
+        # 여러 라우터의 lifespan에서 열 수 있으므로 마지막 close()에서 실제로 닫음
+        self._users += 1
+        if self._conn is not None or not self.path:
+            return
+        try:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logger.warning("snapshot_open_failed", extra={"path": self.path, "error": str(e)})
+            return
+        self._conn = conn
+        # 시작할 때 load()가 오래된 행까지 읽지 않도록 먼저 정리
+        with self._lock:
+            self._prune()
+        self._writer = threading.Thread(target=self._write_loop, name="snapshot-writer", daemon=True)
+        self._writer.start()
+
+    def close(self):
+        self._users = max(0, self._users - 1)
+        if self._users or self._conn is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        with self._lock:
+            self._conn.close()
+            self._conn = None
+        self._writer = None
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            # 밀린 쓰기는 한 트랜잭션으로 모아서 커밋
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            if rows:
+                with self._lock:
+                    try:
+                        with self._conn:
+                            self._conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)", rows)
+                    except sqlite3.Error as e:
+                        logger.warning("snapshot_write_failed", extra={"rows": len(rows), "error": str(e)})
+                    if time.monotonic() - self._pruned_at >= self.prune_interval:
+                        self._prune()
+            if None in batch:
+                return
+
+    def _prune(self):
+        # self._lock을 잡은 상태에서 호출
+        self._pruned_at = time.monotonic()
+        try:
+            with self._conn:
+                self._conn.execute("DELETE FROM snapshots WHERE updated_at < ?", (time.time() - self.max_age,))
+                for (namespace,) in self._conn.execute("SELECT DISTINCT namespace FROM snapshots").fetchall():
+                    self._conn.execute(
+                        "DELETE FROM snapshots WHERE namespace = ? AND key IN "
+                        "(SELECT key FROM snapshots WHERE namespace = ? ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                        (namespace, namespace, self.max_rows)
+                    )
+        except sqlite3.Error as e:
+            logger.warning("snapshot_prune_failed", extra={"error": str(e)})
+
+    def save(self, namespace: str, key: Hashable, value: Any):
+        if self._conn is None:
+            return
+        self._queue.put((namespace, self._encode(key), self._encode(value), time.time()))
+
+    def get(self, namespace: str, key: Hashable) -> Optional[tuple[Any, float]]:
+        """(값, 저장 시각) 또는 None"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT value, updated_at FROM snapshots WHERE namespace = ? AND key = ?", (namespace, self._encode(key))).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def load(self, namespace: str) -> list[tuple[Any, Any, float]]:
+        """(키, 값, 저장 시각) 목록 (시작할 때 캐시를 채우는 용도)"""
+        if self._conn is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute("SELECT key, value, updated_at FROM snapshots WHERE namespace = ?", (namespace,)).fetchall()
+        return [(json.loads(key), json.loads(value), updated_at) for key, value, updated_at in rows]
+
+snapshots = SnapshotStore(
+    os.getenv("SNAPSHOT_PATH", os.path.join("app", "snapshots.sqlite3")),
+    max_age=int(os.getenv("SNAPSHOT_MAX_AGE", 30 * 86400)),
+    max_rows=int(os.getenv("SNAPSHOT_MAX_ROWS", 10000))
+)
+# 업스트림 장애로 스냅샷을 응답할 때 다시 업스트림을 시도하기까지의 캐시 시간 (초)
+STALE_TTL = int(os.getenv("SNAPSHOT_STALE_TTL", 60))
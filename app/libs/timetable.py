@@ -0,0 +1,199 @@
+import hashlib
+import os
+import time
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+
+from pycomcigan import TimeTable
+
+from app.libs.cache import TTLCache
+from app.libs.metrics import registry, upstream
+from app.libs.snapshot import snapshots, STALE_TTL
+from app.libs.log import logger
+
+class OriginalLesson(NamedTuple):
+    period: int
+    subject: str
+    teacher: str
+
+class Lesson(NamedTuple):
+    period: int
+    subject: str
+    teacher: str
+    replaced: bool
+    original: Optional[OriginalLesson]
+
+    def as_dict(self) -> dict:
+        return {
+            "period": self.period,
+            "subject": self.subject,
+            "teacher": self.teacher,
+            "replaced": self.replaced,
+            "original": self.original._asdict() if self.original is not None else None
+        }
+
+# 하루치 수업, 일주일치 수업 (월요일부터)
+Day = tuple[Lesson, ...]
+Week = tuple[Day, ...]
+
+class WeekTimetable:
+    """pycomcigan 시간표를 한 번만 변환해 둔 불변 일주일 시간표
+
+    여러 요청이 같은 객체를 공유하므로 내부 데이터는 모두 튜플로 유지하며 수정하지 않습니다.
+    stale은 컴시간 장애로 스냅샷에서 복원한 시간표인지 여부입니다.
+    """
+
+    __slots__ = ("school_name", "school_code", "stale", "_classes", "_homerooms", "_content_hash", "_rendered")
+
+    def __init__(self, school_name: str, school_code: int, classes: dict[tuple[int, int], Week], homerooms: dict[tuple[int, int], str], stale: bool = False):
+        self.school_name = school_name
+        self.school_code = school_code
+        self.stale = stale
+        self._classes = classes
+        self._homerooms = homerooms
+        self._content_hash: Optional[str] = None
+        self._rendered: dict[Hashable, Any] = {}
+
+    @classmethod
+    def from_comcigan(cls, timetable) -> "WeekTimetable":
+        classes = {}
+        homerooms = {}
+        for grade, grade_data in enumerate(timetable.timetable):
+            for _class, class_data in enumerate(grade_data):
+                if not class_data:
+                    continue
+                # 0번째 인덱스는 빈 배열이므로 제외
+                classes[(grade, _class)] = tuple(
+                    tuple(
+                        Lesson(
+                            period=lesson.period,
+                            subject=lesson.subject,
+                            teacher=lesson.teacher,
+                            replaced=lesson.replaced,
+                            original=OriginalLesson(lesson.original.period, lesson.original.subject, lesson.original.teacher) if lesson.original is not None else None
+                        )
+                        for lesson in day
+                    )
+                    for day in class_data[1:]
+                )
+                homerooms[(grade, _class)] = timetable.homeroom(grade, _class)
+        return cls(getattr(timetable, "school_name", ""), getattr(timetable, "school_code", 0), classes, homerooms)
+
+    def to_snapshot(self) -> dict:
+        return {
+            "school_name": self.school_name,
+            "school_code": self.school_code,
+            "classes": [[grade, _class, [[list(lesson[:4]) + [list(lesson.original) if lesson.original else None] for lesson in day] for day in week]] for (grade, _class), week in self._classes.items()],
+            "homerooms": [[grade, _class, teacher] for (grade, _class), teacher in self._homerooms.items()]
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict, stale: bool = False) -> "WeekTimetable":
+        classes = {
+            (grade, _class): tuple(
+                tuple(Lesson(period, subject, teacher, replaced, OriginalLesson(*original) if original else None) for period, subject, teacher, replaced, original in day)
+                for day in week
+            )
+            for grade, _class, week in data["classes"]
+        }
+        homerooms = {(grade, _class): teacher for grade, _class, teacher in data["homerooms"]}
+        return cls(data["school_name"], data["school_code"], classes, homerooms, stale)
+
+    def week(self, grade: int, _class: int) -> Week:
+        try:
+            return self._classes[(grade, _class)]
+        except KeyError:
+            raise ValueError(f"{grade}학년 {_class}반 시간표가 없습니다") from None
+
+    def grades(self) -> set[int]:
+        return {grade for grade, _ in self._classes}
+
+    def class_list(self) -> list[str]:
+        return [f"{grade}-{_class}" for grade, _class in self._classes]
+
+    def homeroom(self, grade: int, _class: int) -> str:
+        return self._homerooms.get((grade, _class), "")
+
+    def classes(self, grade: Optional[int] = None, only: Optional[set[tuple[int, int]]] = None):
+        """(학년, 반, 일주일 시간표)를 학년/반 순서대로 순회"""
+        for (_grade, _class), week in self._classes.items():
+            if grade is not None and _grade != grade:
+                continue
+            if only is not None and (_grade, _class) not in only:
+                continue
+            yield _grade, _class, week
+
+    def rendered(self, key: Hashable, render: Callable[[], Any]) -> Any:
+        """render()로 직렬화한 응답을 이 객체에 보관해 두고 재사용 (시간표가 바뀌면 객체가 새로 만들어짐)
+
+        key는 응답 종류와 필터로, 가짓수가 제한된 것만 사용해야 합니다.
+        """
+        value = self._rendered.get(key)
+        if value is None:
+            # 스레드풀에서 동시에 만들어도 결과가 같으므로 잠그지 않음
+            value = self._rendered[key] = render()
+        return value
+
+    @property
+    def content_hash(self) -> str:
+        # 불변 객체이므로 처음 한 번만 계산
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha1(repr((self._classes, self._homerooms)).encode("utf-8")).hexdigest()
+        return self._content_hash
+
+timetable_cache = TTLCache(maxsize=int(os.getenv("COMCIGAN_CACHE_SIZE", 256)), ttl=int(os.getenv("COMCIGAN_CACHE_TTL", 600)))
+registry.register_cache("timetables", timetable_cache.stats)
+
+def _cache_key(school_name: str, week: int, school_code: Optional[int]) -> tuple:
+    # 학교 코드가 있으면 코드로, 없으면 학교 이름으로 캐싱
+    return (school_code if school_code is not None else school_name, week)
+
+def _fetch_timetable(school_name: str, week: int, school_code: Optional[int]) -> WeekTimetable:
+    with upstream("comcigan", "TimeTable"):
+        if school_code is None:
+            timetable = TimeTable(school_name, week)
+        else:
+            timetable = TimeTable(school_name, week, school_code=school_code)
+    timetable = WeekTimetable.from_comcigan(timetable)
+    snapshots.save("timetables", _cache_key(school_name, week, school_code), timetable.to_snapshot())
+    return timetable
+
+def _fetch_or_snapshot(school_name: str, week: int, school_code: Optional[int]) -> WeekTimetable:
+    try:
+        return _fetch_timetable(school_name, week, school_code)
+    except Exception as e:
+        saved = snapshots.get("timetables", _cache_key(school_name, week, school_code))
+        if saved is None:
+            raise
+        logger.warning("comcigan_serving_snapshot", extra={"school": school_name, "week": week, "error": str(e)})
+        return WeekTimetable.from_snapshot(saved[0], stale=True)
+
+def load_timetable(school_name: str, week: int = 0, school_code: Optional[int] = None) -> WeekTimetable:
+    # 스냅샷으로 대신 응답한 시간표는 STALE_TTL 뒤에 다시 컴시간을 시도
+    return timetable_cache.get_or_load(
+        _cache_key(school_name, week, school_code),
+        lambda: _fetch_or_snapshot(school_name, week, school_code),
+        ttl=lambda timetable: STALE_TTL if timetable.stale else None
+    )
+
+def refresh_timetable(school_name: str, week: int = 0, school_code: Optional[int] = None) -> WeekTimetable:
+    """캐시 만료와 상관없이 새로 가져와 교체 (프리페치용)
+
+    클라이언트는 학교 이름만으로도, 학교 코드와 함께도 조회하므로 한 번 가져온 시간표를
+    load_timetable이 쓰는 두 키 (학교 이름, 주)와 (학교 코드, 주)에 모두 넣어 둡니다.
+    """
+    timetable = _fetch_timetable(school_name, week, school_code)
+    code = school_code or timetable.school_code
+    keys = {_cache_key(school_name, week, None), _cache_key(school_name, week, code or None)}
+    for key in keys:
+        timetable_cache.set(key, timetable)
+        if key != _cache_key(school_name, week, school_code):
+            snapshots.save("timetables", key, timetable.to_snapshot())
+    return timetable
+
+def load_snapshots():
+    """저장된 시간표 중 아직 만료되지 않은 것으로 캐시를 채움 (lifespan에서 호출)"""
+    now = time.time()
+    for key, data, updated_at in snapshots.load("timetables"):
+        remaining = timetable_cache.ttl - (now - updated_at)
+        if remaining > 0:
+            timetable_cache.set(tuple(key), WeekTimetable.from_snapshot(data), remaining)
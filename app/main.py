@@ -1,11 +1,43 @@
+import os
+from contextlib import AsyncExitStack, asynccontextmanager
+from importlib import import_module
+from dotenv import load_dotenv
+
+# 라이브러리 모듈이 import 시점에 환경 변수를 읽으므로 가장 먼저 한 번만 불러옴
+load_dotenv()
+
 from fastapi import FastAPI, Response
 from fastapi.responses import PlainTextResponse
-from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
-from app.routers import comcigan, snt_lunch, snt_schedule, slunch_noti, slunch_comment
+from app.libs.scheduler import scheduler
+from app.libs.http_cache import HTTPCacheMiddleware, until_midnight
+from app.libs.metrics import MetricsMiddleware, registry
+from app.libs.log import setup_logging, shutdown_logging
 
-load_dotenv()
+# 라우터 모듈 이름: (prefix, 태그)
+ROUTERS = {
+    "comcigan": ("/comcigan", "컴시간"),
+    "snt_lunch": ("/snt_lunch", "선린인터넷고 급식"),
+    "snt_schedule": ("/snt_schedule", "선린인터넷고 학사일정"),
+    "slunch_noti": ("/slunch_noti", "Slunch 급식 알림"),
+    "slunch_comment": ("/slunch_comment", "Slunch 급식 댓글"),
+    "status": ("/status", "상태")
+}
+
+def enabled_routers() -> list[str]:
+    """ENABLED_ROUTERS (쉼표로 구분, 기본값은 전체)"""
+    value = os.getenv("ENABLED_ROUTERS", "").strip()
+    if not value:
+        return list(ROUTERS)
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in ROUTERS]
+    if unknown:
+        raise ValueError(f"알 수 없는 라우터: {', '.join(unknown)}")
+    return names
+
+# 활성화된 라우터만 import하므로 사용하지 않는 라우터의 의존성(Firebase, Mongo 등)은 불러오지 않음
+routers = {name: import_module(f"app.routers.{name}") for name in enabled_routers()}
 
 tags_metadata = [
     {
@@ -27,9 +59,26 @@ tags_metadata = [
     {
         'name': 'Slunch 급식 댓글',
         'description': 'Slunch의 급식 댓글을 관리합니다.'
+    },
+    {
+        'name': '상태',
+        'description': '프리페치 스케줄러와 캐시 상태를 확인합니다.'
     }
 ]
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging(os.getenv("LOG_LEVEL", "INFO"))
+    async with AsyncExitStack() as stack:
+        # 각 라우터가 필요한 클라이언트(NEIS, Mongo 등)를 열고 프리페치 작업을 등록
+        for module in routers.values():
+            if hasattr(module, "lifespan"):
+                await stack.enter_async_context(module.lifespan(app))
+        await scheduler.start()
+        stack.push_async_callback(scheduler.stop)
+        yield
+    shutdown_logging()
+
 app = FastAPI(
     title="NPI",
     description="NY64's Private API",
@@ -40,9 +89,21 @@ app = FastAPI(
         'email': 'me@ny64.kr'
     },
     redoc_url=None,
-    openapi_tags=tags_metadata
+    openapi_tags=[tag for tag in tags_metadata if tag['name'] in {ROUTERS[name][1] for name in routers}],
+    lifespan=lifespan
 )
 
+# 경로별 Cache-Control max-age (초)
+# cache_version이 있는 라우터는 데이터가 그대로인 동안 재검증 요청에 핸들러 없이 304로 응답
+app.add_middleware(HTTPCacheMiddleware, rules={
+    "/snt_lunch": until_midnight,
+    "/snt_schedule": 3 * 3600,
+    "/comcigan": 300,
+    "/comcigan/search": 3600,
+    "/slunch_comment": 5
+}, versions={ROUTERS[name][0]: module.cache_version for name, module in routers.items() if hasattr(module, "cache_version")})
+app.add_middleware(MetricsMiddleware)
+
 @app.get("/", response_class=PlainTextResponse)
 def root() -> PlainTextResponse:
     return f"""NY64's Private API v{app.version}
@@ -50,8 +111,10 @@ API Docs: /docs
 Contact: {app.contact['email']}
 """
 
-app.include_router(comcigan.router, prefix="/comcigan", tags=["컴시간"])
-app.include_router(snt_lunch.router, prefix="/snt_lunch", tags=["선린인터넷고 급식"])
-app.include_router(snt_schedule.router, prefix="/snt_schedule", tags=["선린인터넷고 학사일정"])
-app.include_router(slunch_noti.router, prefix="/slunch_noti", tags=["Slunch 급식 알림"])
-app.include_router(slunch_comment.router, prefix="/slunch_comment", tags=["Slunch 급식 댓글"])
\ No newline at end of file
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+for name, module in routers.items():
+    prefix, tag = ROUTERS[name]
+    app.include_router(module.router, prefix=prefix, tags=[tag])
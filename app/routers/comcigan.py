@@ -1,11 +1,41 @@
 from typing import List, Annotated, Optional
-from fastapi import APIRouter, Query
+import asyncio
+import os
+import hashlib
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Query, Header, Response as HTTPResponse
 from pydantic import BaseModel, Field
-from pycomcigan import TimeTable, get_school_code
-
-from .responses import ErrorResponse, Response
+from pycomcigan import get_school_code
+
+from .responses import NO_CACHE, ErrorResponse, Response, SnapshotResponse, error_response, snapshot_headers
+from app.libs import prefetch
+from app.libs.cache import TTLCache
+from app.libs.timetable import load_timetable, load_snapshots, refresh_timetable, timetable_cache
+from app.libs.school_index import school_index
+from app.libs.metrics import SCHOOL_SEARCHES, upstream
+from app.libs.scheduler import scheduler
+from app.libs.serialize import FastJSONResponse, dumps
+from app.libs.snapshot import snapshots
 
 router = APIRouter()
+# 같은 검색어로 동시에 들어온 인덱스 미스가 컴시간 호출 하나를 공유하도록 사용
+search_cache = TTLCache(maxsize=1024, ttl=60)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    snapshots.open()
+    load_snapshots()
+    if prefetch.enabled():
+        prefetch.register_timetable_jobs(scheduler, refresh_timetable)
+    # 검색 인덱스는 검색할 때마다가 아니라 주기적으로 모아서 저장
+    scheduler.add("school_index", lambda: asyncio.to_thread(school_index.flush), interval=int(os.getenv("SCHOOL_INDEX_SAVE_INTERVAL", 60)))
+    yield
+    school_index.flush()
+    snapshots.close()
+
+def cache_version() -> tuple[int, int]:
+    # 시간표 캐시나 학교 검색 인덱스가 바뀌면 HTTP 캐시 미들웨어가 기억해 둔 ETag로 304 응답하지 않음
+    return (timetable_cache.version, school_index.version)
 
 class OriginalClass(BaseModel):
     period: int = Field(description="대체된 교시", example=1)
@@ -22,10 +52,23 @@ class ClassInfo(BaseModel):
 class TimetableResponse(BaseModel):
     success: bool = Field(description="성공 여부", example=True)
     data: List[List[ClassInfo]] = Field(description="시간표")
+    stale: bool = Field(False, description="업스트림 장애로 저장해 둔 스냅샷을 응답했는지 여부", example=False)
+
+class ClassTimetable(BaseModel):
+    grade: int = Field(description="학년", example=1)
+    school_class: int = Field(description="반", example=1)
+    homeroom: str = Field(description="담임 선생님", example="김환*")
+    timetable: List[List[ClassInfo]] = Field(description="시간표")
+
+class SchoolTimetableResponse(BaseModel):
+    success: bool = Field(description="성공 여부", example=True)
+    data: List[ClassTimetable] = Field(description="반별 시간표")
+    stale: bool = Field(False, description="업스트림 장애로 저장해 둔 스냅샷을 응답했는지 여부", example=False)
 
 class ClasslistResponse(BaseModel):
     success: bool = Field(description="성공 여부", example=True)
     data: List[str] = Field(description="반 리스트", example=["1-1","1-2",'1-3',"1-4","1-5"])
+    stale: bool = Field(False, description="업스트림 장애로 저장해 둔 스냅샷을 응답했는지 여부", example=False)
 
 class SchoolInfo(BaseModel):
     name: str = Field(description="학교 이름", example="선린인터넷고")
@@ -39,49 +82,102 @@ class SchoolSearchResponse(BaseModel):
 class HomeroomResponse(BaseModel):
     success: bool = Field(description="성공 여부", example=True)
     data: str = Field(description="담임 선생님", example="김환*")
+    stale: bool = Field(False, description="업스트림 장애로 저장해 둔 스냅샷을 응답했는지 여부", example=False)
 
 
-def get_timetable(school_name: str, school_grade: int, school_class: int, next_week: bool, school_code: Optional[int] = None) -> Response | ErrorResponse:
+def get_timetable(school_name: str, school_grade: int, school_class: int, next_week: bool, school_code: Optional[int] = None) -> FastJSONResponse | ErrorResponse:
     try:
-        if school_code is None:
-            timetable = TimeTable(school_name, 1 if next_week else 0)
-        else:
-            timetable = TimeTable(school_name, 1 if next_week else 0, school_code=school_code)
-        del timetable.timetable[school_grade][school_class][0] # 0번째 인덱스에 빈 배열 제거
-        return Response(data=timetable.timetable[school_grade][school_class])
+        timetable = load_timetable(school_name, 1 if next_week else 0, school_code)
+        week = timetable.week(school_grade, school_class)
+        # 같은 시간표 객체에서는 반별 응답을 한 번만 직렬화
+        return FastJSONResponse(timetable.rendered(("timetable", school_grade, school_class), lambda: dumps({
+            "success": True,
+            "data": [[lesson.as_dict() for lesson in day] for day in week],
+            "stale": timetable.stale
+        })), headers=snapshot_headers(timetable.stale))
     except Exception as e:
-        return ErrorResponse(error=str(e))
+        return error_response(str(e))
 
-def get_classlist(school_name: str, school_code: Optional[int] = None) -> Response | ErrorResponse:
+def parse_class_filter(classes: str) -> set[tuple[int, int]]:
+    # "1-1,1-2" 형식 (classlist 응답과 동일)
+    only = set()
+    try:
+        for item in classes.split(","):
+            if item.strip():
+                # 학년-반 두 값이 아니면 언패킹에서 ValueError
+                grade, _class = item.strip().split("-")
+                only.add((int(grade), int(_class)))
+    except ValueError:
+        raise ValueError("classes는 1-1,1-2 형식이어야 합니다")
+    return only
+
+def get_school_timetable(school_name: str, next_week: bool, school_code: Optional[int] = None, grade: Optional[int] = None, classes: Optional[str] = None, if_none_match: Optional[str] = None) -> FastJSONResponse | ErrorResponse | HTTPResponse:
     try:
-        if school_code is None:
-            timetable = TimeTable(school_name, 0)
+        timetable = load_timetable(school_name, 1 if next_week else 0, school_code)
+        only = parse_class_filter(classes) if classes else None
+
+        # 같은 시간표 + 같은 필터면 같은 ETag
+        etag = '"' + hashlib.sha1(f"{timetable.content_hash}:{grade}:{sorted(only) if only else ''}".encode()).hexdigest() + '"'
+        if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return HTTPResponse(status_code=304, headers={"ETag": etag})
+
+        def render() -> bytes:
+            return dumps({
+                "success": True,
+                "data": [
+                    {
+                        "grade": _grade,
+                        "school_class": _class,
+                        "homeroom": timetable.homeroom(_grade, _class),
+                        "timetable": [[lesson.as_dict() for lesson in day] for day in week]
+                    }
+                    for _grade, _class, week in timetable.classes(grade, only)
+                ],
+                "stale": timetable.stale
+            })
+
+        # 반 목록 필터는 조합이 많으므로 전체/학년 단위 응답만 보관
+        if only is None and (grade is None or grade in timetable.grades()):
+            body = timetable.rendered(("school_timetable", grade), render)
         else:
-            timetable = TimeTable(school_name, 0, school_code=school_code)
-        class_list = [f"{grade}-{_class}" for grade, grade_data in enumerate(timetable.timetable) for _class, class_data in enumerate(grade_data) if class_data]
-        return Response(data=class_list)
+            body = render()
+        headers = {"ETag": etag}
+        if timetable.stale:
+            headers.update(NO_CACHE)
+        return FastJSONResponse(body, headers=headers)
+    except Exception as e:
+        return error_response(str(e))
+
+def get_classlist(school_name: str, school_code: Optional[int] = None) -> FastJSONResponse | ErrorResponse:
+    try:
+        timetable = load_timetable(school_name, 0, school_code)
+        return FastJSONResponse(timetable.rendered(("classlist",), lambda: dumps({"success": True, "data": timetable.class_list(), "stale": timetable.stale})), headers=snapshot_headers(timetable.stale))
     except Exception as e:
-        return ErrorResponse(error=str(e))
+        return error_response(str(e))
         
 def search_school(school_name: str) -> Response | ErrorResponse:
     try:
-        search_results = get_school_code(school_name)
-        print(search_results)
+        search_results = school_index.search(school_name)
+        SCHOOL_SEARCHES.inc(source="index" if search_results is not None else "upstream")
+        if search_results is None:
+            def fetch():
+                with upstream("comcigan", "get_school_code"):
+                    results = get_school_code(school_name)
+                school_index.merge(school_name, results)
+                return results
+            search_results = search_cache.get_or_load(school_name, fetch)
         filtered_results = [{'name': result[2], 'period': result[1], 'code': result[3]} for result in search_results if result[0] != 0] # code가 0인 학교는 제외
         return Response(data=filtered_results)
     except Exception as e:
-        return ErrorResponse(error=str(e))
+        return error_response(str(e))
 
 def get_homeroom_teacher(school_name: str, school_grade: int, school_class: int, school_code: Optional[int] = None) -> Response | ErrorResponse:
     try:
-        if school_code is None:
-            timetable = TimeTable(school_name, 0)
-        else:
-            timetable = TimeTable(school_name, 0, school_code=school_code)
+        timetable = load_timetable(school_name, 0, school_code)
         homeroom_teacher = timetable.homeroom(school_grade, school_class)
-        return Response(data=homeroom_teacher)
+        return FastJSONResponse(SnapshotResponse(data=homeroom_teacher, stale=timetable.stale).model_dump(), headers=snapshot_headers(timetable.stale))
     except Exception as e:
-        return ErrorResponse(error=str(e))
+        return error_response(str(e))
 
 @router.get("/timetable", responses = {
     200: {"model": TimetableResponse, "description": "시간표 조회 성공"}, 400: {"model": ErrorResponse, "description": "시간표 조회 실패"}
@@ -95,6 +191,19 @@ def timetable(
 ) -> TimetableResponse | ErrorResponse:
     return get_timetable(school_name, school_grade, school_class, next_week, school_code)
 
+@router.get("/school_timetable", responses = {
+    200: {"model": SchoolTimetableResponse, "description": "학교 전체 시간표 조회 성공"}, 304: {"description": "시간표 변경 없음 (If-None-Match)"}, 400: {"model": ErrorResponse, "description": "학교 전체 시간표 조회 실패"}
+})
+def school_timetable(
+    school_name: Annotated[str, Query(description="학교 이름\n\n중복되는 학교가 없을 경우 일부만 입력해도 자동으로 선택됩니다.")],
+    next_week: Annotated[bool, Query(description="다음 주 시간표를 가져올지 여부")] = False,
+    school_code: Annotated[Optional[int], Query(description="학교 코드")] = None,
+    grade: Annotated[Optional[int], Query(description="학년 (지정하면 해당 학년만)")] = None,
+    classes: Annotated[Optional[str], Query(description="가져올 반 목록 (예: 1-1,2-3)")] = None,
+    if_none_match: Annotated[Optional[str], Header()] = None
+) -> SchoolTimetableResponse | ErrorResponse:
+    return get_school_timetable(school_name, next_week, school_code, grade, classes, if_none_match)
+
 @router.get('/classlist', responses = {
     200: {"model": ClasslistResponse, "description": "반 리스트 조회 성공"}, 400: {"model": ErrorResponse, "description": "반 리스트 조회 실패"}
 })
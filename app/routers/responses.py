@@ -1,5 +1,10 @@
 from pydantic import BaseModel, Field
-from typing import Any
+from typing import Any, Optional
+
+from app.libs.serialize import FastJSONResponse
+
+# HTTP 캐시 미들웨어가 ETag를 기억하거나 304로 응답하지 않도록 하는 헤더
+NO_CACHE = {"Cache-Control": "no-cache"}
 
 class ErrorResponse(BaseModel):
     success: bool = Field(False, description="성공 여부")
@@ -7,4 +12,15 @@ class ErrorResponse(BaseModel):
 
 class Response(BaseModel):
     success: bool = Field(True, description="성공 여부")
-    data: Any = Field(..., description="데이터")
\ No newline at end of file
+    data: Any = Field(..., description="데이터")
+
+class SnapshotResponse(Response):
+    stale: bool = Field(False, description="업스트림 장애로 저장해 둔 스냅샷을 응답했는지 여부")
+
+def error_response(error: str) -> FastJSONResponse:
+    """ErrorResponse 본문에 Cache-Control: no-cache를 붙인 응답 (실패 응답은 캐싱하지 않음)"""
+    return FastJSONResponse(ErrorResponse(error=error).model_dump(), headers=NO_CACHE)
+
+def snapshot_headers(stale: bool) -> Optional[dict]:
+    # 스냅샷으로 대신한 응답은 업스트림이 돌아오면 바로 바뀌어야 하므로 캐싱하지 않음
+    return NO_CACHE if stale else None
@@ -1,21 +1,99 @@
-from fastapi import APIRouter, Query, Request, HTTPException, Depends, Body, Header
+from fastapi import APIRouter, FastAPI, Query, Request, HTTPException, Depends, Body, Header
+from fastapi.responses import StreamingResponse
 import os
 from bson.json_util import dumps
 import json
-from datetime import datetime, timedelta
+from contextlib import asynccontextmanager
+from datetime import datetime
 from typing import Optional
-from dotenv import load_dotenv
 import hashlib
 import hmac
+import base64
 from bson import ObjectId
+from bson.errors import InvalidId
+from pydantic import Field
 import re
+import time
 
 from .responses import ErrorResponse, Response
-from app.libs.database import db
+from app.libs.database import mongo
+from app.libs.comment_cache import comment_cache
+from app.libs.comment_stream import comment_hub
+from app.libs.limiter import limiter, ban_list
+from app.libs.log import logger
+from app.libs.scheduler import scheduler
 
-load_dotenv()
 router = APIRouter()
-db = db(os.getenv("MONGODB_URL"), "slunch")
+
+# 같은 uuid의 쓰기(작성/수정) 사이 최소 간격 (초)
+WRITE_INTERVAL = 30
+# 댓글 스트림에 이벤트가 없을 때 연결 유지용 주석을 보내는 간격 (초)
+STREAM_HEARTBEAT = int(os.getenv("COMMENT_STREAM_HEARTBEAT", 15))
+# 스트림 연결 최대 유지 시간 (초). uvicorn은 열린 응답이 끝나야 종료하므로 연결을 주기적으로 끊고 다시 연결하게 함
+STREAM_MAX_AGE = int(os.getenv("COMMENT_STREAM_MAX_AGE", 300))
+
+class CommentListResponse(Response):
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (before 파라미터로 전달)")
+
+async def ensure_indexes():
+    # 피드 조회 (date 범위 + date 내림차순, _id로 동률 정렬)
+    await mongo.create_index("comments", [("date", -1), ("_id", -1)])
+    # 작성 속도 제한 조회 (uuid + date)
+    await mongo.create_index("comments", [("uuid", 1), ("date", -1)])
+    try:
+        await mongo.create_index("blocked_uuids", [("uuid", 1)], unique=True)
+    except Exception as e:
+        logger.warning("index_creation_failed", extra={"collection": "blocked_uuids", "error": str(e)})
+    await limiter.ensure_indexes()
+
+# 인덱스 생성과 댓글 캐시 워밍업을 마쳤는지
+storage_ready = False
+
+async def prepare_storage():
+    """Mongo가 필요한 시작 작업 (인덱스 생성, 오늘 댓글 캐시 워밍업)
+
+    Mongo에 연결할 수 없어도 API 전체가 뜨도록 lifespan에서 기다리지 않고 스케줄러 작업으로 실행합니다.
+    실패하면 로그를 남기고 스케줄러가 다시 시도하며, 한 번 성공한 뒤에는 아무것도 하지 않습니다.
+    """
+    global storage_ready
+    if storage_ready:
+        return
+    try:
+        await ensure_indexes()
+        await comment_cache.load()
+    except Exception as e:
+        logger.warning("comment_storage_prepare_failed", extra={"error": str(e)})
+        raise
+    storage_ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 여기서는 Mongo에 요청하지 않음 (클라이언트는 첫 요청 때 연결)
+    mongo.open(os.getenv("MONGODB_URL"))
+    await limiter.open()
+    await comment_hub.open()
+    scheduler.add("comment_storage", prepare_storage, interval=int(os.getenv("COMMENT_STORAGE_RETRY_INTERVAL", 30)))
+    scheduler.add("blocked_uuids", ban_list.refresh, interval=int(os.getenv("BAN_REFRESH_INTERVAL", 60)))
+    yield
+    await comment_hub.close()
+    await limiter.close()
+    await mongo.close()
+
+def encode_cursor(comment: dict) -> str:
+    raw = f"{comment['date'].isoformat()}|{comment['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        date, _id = raw.split("|")
+        date = datetime.fromisoformat(date)
+        # 저장된 날짜는 naive이므로 오프셋이 붙은 커서는 비교할 수 없음
+        if date.tzinfo is not None:
+            raise ValueError("aware cursor")
+        return date, ObjectId(_id)
+    except (ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 # HMAC-SHA256 서명 생성 
 def generate_signature(uuid: str, timestamp: int, secret_key: str) -> str:
@@ -23,6 +101,32 @@ def generate_signature(uuid: str, timestamp: int, secret_key: str) -> str:
     signature = hmac.new(secret_key.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
     return signature
 
+def comment_event(comment: dict) -> dict:
+    # 목록 조회(GET)의 항목과 같은 모양
+    return {
+        "username": comment["username"],
+        "comment": comment["comment"],
+        "date": comment["date"].isoformat(),
+        "uuid": comment["uuid"],
+        "id": str(comment["_id"]),
+        "edited": comment.get("edited", False)
+    }
+
+def reject(reason: str, status_code: int, detail: str):
+    limiter.reject(reason)
+    raise HTTPException(status_code=status_code, detail=detail)
+
+def verify_request(uuid: Optional[str], timestamp: int, signature: Optional[str]):
+    # Validate timestamp
+    server_timestamp = int(datetime.now().timestamp() * 1000)
+    if abs(server_timestamp - timestamp) > 30000:
+        reject("invalid_timestamp", 403, "Invalid timestamp")
+
+    # Validate signature (constant-time compare)
+    server_signature = generate_signature(str(uuid), timestamp, os.getenv("SECRET_KEY"))
+    if not hmac.compare_digest((signature or "").encode('utf-8'), server_signature.encode('utf-8')):
+        reject("invalid_signature", 403, "Invalid signature")
+
 def check_non_normal_unicode(text: str) -> bool:
     non_normal_unicode = r"[\uD800-\uDFFF\uDC00-\uDFFF\uFEFF]"
     blank_chars = r"[\u00A0\u2002\u2003\u2009\u200A\u200B\u202F\u205F\u3000\uFEFF\u0009]"
@@ -30,15 +134,27 @@ def check_non_normal_unicode(text: str) -> bool:
     if re.search(non_normal_unicode, text) or re.search(blank_chars, text):
         return True
     
-@router.get("")
-async def comment(page: int = Query(1, gt=0), page_size: int = Query(10, gt=0, le=100)):
+@router.get("", response_model=CommentListResponse)
+async def comment(page: int = Query(1, gt=0),
+                  page_size: int = Query(10, gt=0, le=100),
+                  before: Optional[str] = Query(None, description="이전 응답의 next_cursor. 지정하면 page 대신 커서 기준으로 조회합니다.")):
     today = datetime.now().date()
     start_of_day = datetime(today.year, today.month, today.day, 0, 0, 0, 0)
     end_of_day = datetime(today.year, today.month, today.day, 23, 59, 59, 999999)
-    
-    comments = db.find("comments", {"date": {"$gte": start_of_day, "$lt": end_of_day}}).sort("date", -1)
-    comments = comments.skip((page - 1) * page_size).limit(page_size)
-    comments = list(comments)
+    query = {"date": {"$gte": start_of_day, "$lt": end_of_day}}
+    cursor = decode_cursor(before) if before is not None else None
+
+    comments = await comment_cache.page(page, page_size, cursor)
+    if comments is None:
+        if cursor is not None:
+            # skip 대신 (date, _id) 인덱스 위치부터 바로 읽음
+            before_date, before_id = cursor
+            query["$or"] = [{"date": {"$lt": before_date}}, {"date": before_date, "_id": {"$lt": before_id}}]
+            comments = mongo.find("comments", query).sort([("date", -1), ("_id", -1)]).limit(page_size)
+        else:
+            comments = mongo.find("comments", query).sort([("date", -1), ("_id", -1)])
+            comments = comments.skip((page - 1) * page_size).limit(page_size)
+        comments = await mongo.to_list(comments, length=page_size)
     
     data = []
     for comment in comments:
@@ -51,7 +167,35 @@ async def comment(page: int = Query(1, gt=0), page_size: int = Query(10, gt=0, l
             "edited": comment.get("edited", False)
         })
     
-    return Response(data=data)
+    next_cursor = encode_cursor(comments[-1]) if len(comments) == page_size else None
+    return CommentListResponse(data=data, next_cursor=next_cursor)
+
+@router.get("/stream", response_class=StreamingResponse, responses={
+    200: {"content": {"text/event-stream": {}}, "description": "새 댓글(created)과 수정된 댓글(edited)을 Server-Sent Events로 전달합니다. data는 목록 조회의 항목과 같은 모양입니다."},
+    503: {"description": "구독자 수가 한도를 넘음"}
+})
+async def comment_stream():
+    if comment_hub.full:
+        raise HTTPException(status_code=503, detail="Too many subscribers")
+
+    async def events():
+        # 응답을 보내기 시작할 때 구독해야 연결이 먼저 끊겨도 구독자가 남지 않음
+        subscriber = comment_hub.subscribe()
+        if subscriber is None:
+            return
+        deadline = time.monotonic() + STREAM_MAX_AGE
+        try:
+            yield "retry: 3000\n\n"
+            while (remaining := deadline - time.monotonic()) > 0:
+                frame = await subscriber.next(min(STREAM_HEARTBEAT, remaining))
+                if frame is None:
+                    # 너무 느려서 끊겼거나 서버 종료 (클라이언트는 retry 뒤 다시 연결)
+                    return
+                yield frame or ": ping\n\n"
+        finally:
+            comment_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @router.post("")
 async def comment(request: Request, 
@@ -63,83 +207,71 @@ async def comment(request: Request,
                   x_real_ip: str = Header(None)):
 
     if not x_uuid or not x_timestamp or not x_signature:
-        raise HTTPException(status_code=403, detail="Missing headers")
+        reject("missing_headers", 403, "Missing headers")
 
-    thirty_seconds_ago = datetime.now() - timedelta(seconds=30)
-    server_timestamp = int(datetime.now().timestamp() * 1000)
+    # Cheap checks first so forged or flooding requests never reach the database
+    verify_request(x_uuid, x_timestamp, x_signature)
     
+    # Check if username or comment contains non-normal unicode characters
+    if check_non_normal_unicode(username) or check_non_normal_unicode(comment):
+        reject("non_normal_unicode", 403, "Non-normal unicode characters are not allowed")
+
     # Check if user is banned
-    if db.find_one("blocked_uuids", {"uuid": x_uuid}):
-        print(f"Banned user {x_uuid} tried to comment")
-        db.update("blocked_uuids", {"uuid": x_uuid}, {"$inc": {"count": 1}})
-        raise HTTPException(status_code=403, detail="You are banned from commenting")
+    if x_uuid in ban_list:
+        logger.info("banned_user_comment", extra={"uuid": x_uuid})
+        await mongo.update_one("blocked_uuids", {"uuid": x_uuid}, {"$inc": {"count": 1}})
+        reject("banned", 403, "You are banned from commenting")
 
     # Check if user is commenting too fast
-    if db.find_one("comments", {"uuid": x_uuid, "date": {"$gte": thirty_seconds_ago}}):
-        raise HTTPException(status_code=429, detail="You are commenting too fast")
-
-    # Validate timestamp
-    if abs(server_timestamp - x_timestamp) > 30000:
-        raise HTTPException(status_code=403, detail="Invalid timestamp")
-
-    # Validate signature
-    secret_key = os.getenv("SECRET_KEY")
-    server_signature = generate_signature(x_uuid, x_timestamp, secret_key)
-    if x_signature != server_signature:
-        raise HTTPException(status_code=403, detail="Invalid signature")
-    
-    # Check if username or comment contains non-normal unicode characters
-    if check_non_normal_unicode(username) or check_non_normal_unicode(comment):
-        raise HTTPException(status_code=403, detail="Non-normal unicode characters are not allowed")
+    if not await limiter.allow(f"write:{x_uuid}", 1, WRITE_INTERVAL):
+        reject("rate_limited", 429, "You are commenting too fast")
 
     today = datetime.now()
-    print(f"Comment from {x_real_ip}: {username} - {comment}")
+    logger.info("comment_created", extra={"ip": x_real_ip, "username": username, "comment": comment})
 
     # Save comment to database
-    db.insert("comments", {
+    new_comment = {
         "username": username,
         "comment": comment,
         "date": today,
         "ip": x_real_ip,
         "uuid": x_uuid
-    })
+    }
+    await mongo.insert("comments", new_comment)
+    await comment_cache.add(new_comment)
+    await comment_hub.publish("created", comment_event(new_comment))
 
     return {"username": username, "comment": comment, "date": today, "ip": x_real_ip}
 
 @router.put("/{comment_id}")
 async def update_comment(comment_id: str, comment: str = Body(..., max_length=40), x_uuid: str = Header(None), x_timestamp: int = Header(-1), x_signature: str = Header(None)):
     if x_timestamp == -1:
-        raise HTTPException(status_code=403, detail="Missing headers")
-    
-    thirty_seconds_ago = datetime.now() - timedelta(seconds=30)
-    server_timestamp = int(datetime.now().timestamp() * 1000)
-    
-    # Check if user is banned
-    if db.find_one("blocked_uuids", {"uuid": x_uuid}):
-        print(f"Banned user {x_uuid} tried to update comment")
-        db.update("blocked_uuids", {"uuid": x_uuid}, {"$inc": {"count": 1}})
-        raise HTTPException(status_code=403, detail="You are banned from updating comments")
+        reject("missing_headers", 403, "Missing headers")
 
-    # Check if user is updating too fast
-    if db.find_one("comments", {"uuid": x_uuid, "date": {"$gte": thirty_seconds_ago}}):
-        raise HTTPException(status_code=429, detail="You are updating too fast")
+    verify_request(x_uuid, x_timestamp, x_signature)
 
-    # Validate timestamp
-    if abs(server_timestamp - x_timestamp) > 30000:
-        raise HTTPException(status_code=403, detail="Invalid timestamp")
-
-    # Validate signature
-    secret_key = os.getenv("SECRET_KEY")
-    server_signature = generate_signature(x_uuid, x_timestamp, secret_key)
-    if x_signature != server_signature:
-        raise HTTPException(status_code=403, detail="Invalid signature")
+    # Check if user is banned
+    if x_uuid in ban_list:
+        logger.info("banned_user_update", extra={"uuid": x_uuid})
+        await mongo.update_one("blocked_uuids", {"uuid": x_uuid}, {"$inc": {"count": 1}})
+        reject("banned", 403, "You are banned from updating comments")
 
-    # Check if comment exists
-    existing_comment = db.find_one("comments", {"_id": ObjectId(comment_id)})  # Corrected line
+    # Check if comment exists before charging the write limit, so a bad id doesn't block real writes
+    try:
+        comment_oid = ObjectId(comment_id)
+    except InvalidId:
+        raise HTTPException(status_code=400, detail="Invalid comment id")
+    existing_comment = await mongo.find_one("comments", {"_id": comment_oid})
     if not existing_comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
+    # Check if user is updating too fast
+    if not await limiter.allow(f"write:{x_uuid}", 1, WRITE_INTERVAL):
+        reject("rate_limited", 429, "You are updating too fast")
+
     # Update comment
-    db.update_one("comments", {"_id": ObjectId(comment_id)}, {"$set": {"comment": comment, "edited": True}})
+    await mongo.update_one("comments", {"_id": comment_oid}, {"$set": {"comment": comment, "edited": True}})
+    await comment_cache.edit(existing_comment["_id"], existing_comment["date"], comment)
+    await comment_hub.publish("edited", comment_event({**existing_comment, "comment": comment, "edited": True}))
     
     return {"username": existing_comment["username"], "comment": comment, "date": existing_comment["date"], "ip": existing_comment["ip"]}
\ No newline at end of file
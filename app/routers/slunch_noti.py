@@ -1,21 +1,43 @@
 from fastapi import APIRouter, Query, Request, HTTPException, Depends, Body
 from pydantic import BaseModel, Field
-import firebase_admin
-from firebase_admin import credentials, messaging
+from typing import List
+import asyncio
+from firebase_admin import messaging
 import os
 import datetime
 from contextlib import contextmanager
-from dotenv import load_dotenv
 
 from .responses import ErrorResponse, Response
+from app.libs import fcm
 
-load_dotenv()
 router = APIRouter()
-firebase_admin.initialize_app(credentials.Certificate(os.path.join("app", "firebase-admin.json")))
 
 class PushNotification(BaseModel):
     title: str
     body: str
+
+class BatchNotification(PushNotification):
+    topics: List[str] = Field(default_factory=list, description="보낼 토픽 목록 (topics와 tokens가 모두 비어 있으면 lunch 토픽)", example=["lunch", "lunch_grade1"])
+    tokens: List[str] = Field(default_factory=list, description="보낼 기기 토큰 목록")
+
+class BatchSendRequest(BaseModel):
+    notifications: List[BatchNotification] = Field(..., min_length=1, description="보낼 알림 목록")
+
+class SendResult(BaseModel):
+    target: str = Field(description="전송 대상", example="topic:lunch")
+    success: bool = Field(description="전송 성공 여부", example=True)
+    message_id: str | None = Field(None, description="FCM 메시지 ID")
+    error: str | None = Field(None, description="실패 사유")
+
+class BatchNotificationResult(BaseModel):
+    title: str = Field(description="알림 제목")
+    success_count: int = Field(description="성공한 전송 수")
+    failure_count: int = Field(description="실패한 전송 수")
+    results: List[SendResult] = Field(description="대상별 전송 결과")
+
+class BatchSendResponse(BaseModel):
+    success: bool = Field(description="성공 여부", example=True)
+    data: List[BatchNotificationResult] = Field(description="알림별 전송 결과")
     
 def authorize_request(request: Request):
     secret_key = os.getenv("SECRET_KEY")
@@ -36,8 +58,35 @@ def send(
             data={"title": notification.title, "body": notification.body},
             topic="lunch"
         )
-        messaging.send(message)
+        fcm.transport.send(message)
         
         return Response(data="푸시 알림 전송됨")
     except Exception as e:
         return ErrorResponse(error=str(e))
+
+@router.post("/send_batch", dependencies=[Depends(authorize_request)], responses={
+    200: {"model": BatchSendResponse, "description": "푸시 알림 일괄 전송 완료 (대상별 결과 포함)"},
+    400: {"model": ErrorResponse, "description": "푸시 알림 일괄 전송 실패"},
+    403: {"model": ErrorResponse, "description": "접근 권한 없음"}
+})
+async def send_batch(
+    request: BatchSendRequest = Body(...),
+) -> BatchSendResponse | ErrorResponse:
+    try:
+        async def dispatch(notification: BatchNotification) -> BatchNotificationResult:
+            topics = notification.topics or ([] if notification.tokens else ["lunch"])
+            data = {"title": notification.title, "body": notification.body}
+            # FCM 호출은 동기 HTTP이므로 요청 스레드(이벤트 루프) 밖에서 실행
+            results = await asyncio.to_thread(fcm.dispatch, fcm.transport, data, topics, notification.tokens)
+            success_count = sum(result["success"] for result in results)
+            return BatchNotificationResult(
+                title=notification.title,
+                success_count=success_count,
+                failure_count=len(results) - success_count,
+                results=results
+            )
+
+        data = await asyncio.gather(*[dispatch(notification) for notification in request.notifications])
+        return BatchSendResponse(success=True, data=data)
+    except Exception as e:
+        return ErrorResponse(error=str(e))
@@ -1,57 +1,76 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, FastAPI, Query
 from typing import List, Annotated, Optional
-from requests import get
 import os
-import re
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import date
 from pydantic import BaseModel, Field
-from dotenv import load_dotenv
 
-from .responses import ErrorResponse, Response
+from .responses import ErrorResponse, Response, error_response, snapshot_headers
+from app.libs import prefetch
+from app.libs.neis import neis
+from app.libs.neis_store import meal_store, parse_school_list, resolve_range, NO_DATA_MESSAGE
+from app.libs.scheduler import scheduler
+from app.libs.serialize import FastJSONResponse, dumps
+from app.libs.snapshot import snapshots
 
-load_dotenv()
 router = APIRouter()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await neis.open()
+    snapshots.open()
+    meal_store.load_snapshot()
+    if prefetch.enabled():
+        prefetch.register_meal_jobs(scheduler, meal_store, parse_school_list(os.getenv("PREFETCH_NEIS_SCHOOLS")))
+    yield
+    snapshots.close()
+    await neis.close()
+
+def cache_version() -> int:
+    # 급식 캐시가 바뀌면 HTTP 캐시 미들웨어가 기억해 둔 ETag로 304 응답하지 않음
+    return meal_store.cache.version
+
 class LunchData(BaseModel):
     date: str = Field(description="날짜", example="2024604")
     menu: List[str] = Field(description="급식 메뉴", example=["발아현미밥","옹심이수제비국","한식잡채","데리야끼닭장각구이","배추김치","멜론"])
+    school_code: str = Field(description="학교 코드 (행정표준코드)", example="7010536")
 
 class LunchResponse(BaseModel):
     success: bool = Field(description="성공 여부", example=True)
     data: Optional[List[LunchData]] = Field(description="급식 정보")
+    stale: bool = Field(False, description="업스트림 장애로 저장해 둔 스냅샷을 응답했는지 여부", example=False)
 
 
 @router.get("", responses = {
     200: {"model": LunchResponse,"description": "급식 정보 조회 성공"}, 
     400: {"model": ErrorResponse, "description": "급식 정보 조회 실패"}
 })
-def lunch(
-    month: int = Query(..., title="월", description="월", ge=1, le=12),
-    day: Optional[int] = Query(None, title="일", description="일", ge=1, le=31)
+async def lunch(
+    month: Optional[int] = Query(None, title="월", description="월 (start/end를 지정하지 않으면 필수)", ge=1, le=12),
+    day: Optional[int] = Query(None, title="일", description="일", ge=1, le=31),
+    year: Optional[int] = Query(None, title="연도", description="연도 (기본값은 올해)", ge=2000, le=2100),
+    start: Optional[date] = Query(None, title="시작일", description="기간 조회 시작일 (예: 2024-12-01, 최대 366일)"),
+    end: Optional[date] = Query(None, title="종료일", description="기간 조회 종료일 (예: 2025-01-31)"),
+    schools: Optional[str] = Query(None, title="학교", description="시도교육청코드:학교코드 목록, 쉼표로 구분 (기본값은 선린인터넷고 B10:7010536)")
 ) -> LunchResponse | ErrorResponse:
     try:
-        if day is not None:
-            date = f"{datetime.now().year}{month:02d}{day:02d}"
-        else:
-            date = f"{datetime.now().year}{month:02d}"
-
-        url = f"https://open.neis.go.kr/hub/mealServiceDietInfo?key={os.getenv('NEIS_API_KEY')}&type=json&ATPT_OFCDC_SC_CODE=B10&SD_SCHUL_CODE=7010536&MMEAL_SC_CODE=2&MLSV_YMD={date}"
-        response = get(url)
-        data = response.json()
-
-        if 'mealServiceDietInfo' not in data:
-            return ErrorResponse(error=data['RESULT']['MESSAGE'])
-
-        results = []
-        for row in data['mealServiceDietInfo'][1]['row']:
-            menu = row['DDISH_NM']
-            lunch_data = LunchData(
-                date=row['MLSV_YMD'],
-                menu=[re.sub(r'\s*\([^)]*\)', '', item.strip()) for item in menu.split('<br/>')]
-            )
-            results.append(lunch_data)
-        
-        return LunchResponse(success=True, data=results)
+        school_list = parse_school_list(schools)
+        start, end = resolve_range(year, month, day, start, end)
+
+        def render(meals: list[tuple], stale: bool) -> Optional[bytes]:
+            # LunchResponse와 같은 모양으로 바로 직렬화 (데이터가 없으면 None)
+            results = [
+                {"date": meal.date, "menu": list(meal.menu), "school_code": school.school_code}
+                for school, school_meals in zip(school_list, meals)
+                for meal in school_meals
+            ]
+            return dumps({"success": True, "data": results, "stale": stale}) if results else None
+
+        body, stale = await meal_store.rendered(school_list, start, end, render)
+        if body is None:
+            return error_response(NO_DATA_MESSAGE)
+
+        return FastJSONResponse(body, headers=snapshot_headers(stale))
         
     except Exception as e:
-        return ErrorResponse(error=str(e))
\ No newline at end of file
+        return error_response(str(e))
\ No newline at end of file
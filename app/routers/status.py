@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+
+from .responses import Response
+from app.libs.scheduler import scheduler
+from app.libs.metrics import registry
+
+router = APIRouter()
+
+@router.get("", responses = {
+    200: {"model": Response, "description": "상태 조회 성공"}
+})
+def status() -> Response:
+    # 활성화된 라우터가 등록한 구성 요소/캐시만 표시
+    return Response(data={
+        "prefetch": scheduler.status(),
+        **{name: stats() for name, stats in registry.statuses.items()},
+        "caches": {name: stats() for name, stats in registry.caches.items()}
+    })
@@ -0,0 +1,240 @@
+"""벤치마크용 로컬 업스트림 (NEIS, 컴시간, Mongo, FCM)
+
+install()은 app을 import하기 전에 호출해야 합니다.
+"""
+import calendar
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple, Optional
+from urllib.parse import parse_qs, urlparse
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# 서비스별 (날짜 필드, 기간 시작 필드, 기간 끝 필드)
+NEIS_DATE_FIELDS = {
+    "mealServiceDietInfo": ("MLSV_YMD", "MLSV_FROM_YMD", "MLSV_TO_YMD"),
+    "SchoolSchedule": ("AA_YMD", "AA_FROM_YMD", "AA_TO_YMD")
+}
+
+def _months(start: str, end: str) -> list[str]:
+    year, month = int(start[:4]), int(start[4:6])
+    months = []
+    while f"{year}{month:02d}" <= end[:6]:
+        months.append(f"{year}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+class NeisServer:
+    """녹화해 둔 NEIS 응답(fixtures/*.json)을 돌려주는 HTTP 서버
+
+    녹화본은 한 달치이며, 요청한 달로 날짜만 바꿔서 응답합니다.
+    날짜/기간 조회와 pIndex/pSize 페이지 나누기를 지원합니다.
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.rows = {}
+        for service in NEIS_DATE_FIELDS:
+            with open(os.path.join(FIXTURES, f"{service}.json"), encoding="utf-8") as f:
+                self.rows[service] = json.load(f)[service][1]["row"]
+        self.calls = 0
+        # 앞으로 500으로 응답할 요청 수 (재시도 확인용)
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/hub"
+
+    def _month_rows(self, service: str, year_month: str) -> list[dict]:
+        date_field = NEIS_DATE_FIELDS[service][0]
+        days = calendar.monthrange(int(year_month[:4]), int(year_month[4:6]))[1]
+        rows = []
+        for row in self.rows[service]:
+            if int(row[date_field][6:8]) > days:
+                continue
+            date = year_month + row[date_field][6:8]
+            rows.append({key: date if key.endswith("_YMD") else value for key, value in row.items()})
+        return rows
+
+    def query(self, service: str, params: dict) -> dict:
+        if service not in NEIS_DATE_FIELDS:
+            return {"RESULT": {"CODE": "ERROR-310", "MESSAGE": "해당하는 서비스를 찾을 수 없습니다."}}
+
+        date_field, from_field, to_field = NEIS_DATE_FIELDS[service]
+        if params.get(date_field):
+            start = end = params[date_field]
+        else:
+            start, end = params.get(from_field, "19000101"), params.get(to_field, "29991231")
+        start, end = start.ljust(8, "0"), end.ljust(8, "9")
+
+        rows = [
+            row
+            for year_month in _months(start, end)
+            for row in self._month_rows(service, year_month)
+            if start <= row[date_field] <= end
+        ]
+        page, size = int(params.get("pIndex", 1)), int(params.get("pSize", 100))
+        page_rows = rows[(page - 1) * size:page * size]
+        if not page_rows:
+            return {"RESULT": {"CODE": "INFO-200", "MESSAGE": "해당하는 데이터가 없습니다."}}
+        return {service: [
+            {"head": [{"list_total_count": len(rows)}, {"RESULT": {"CODE": "INFO-000", "MESSAGE": "정상 처리되었습니다."}}]},
+            {"row": page_rows}
+        ]}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(url.query).items()}
+                with server._lock:
+                    server.calls += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                    failed = server.failures > 0
+                    if failed:
+                        server.failures -= 1
+                try:
+                    if server.latency:
+                        time.sleep(server.latency)
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+                if failed:
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps(server.query(url.path.rsplit("/", 1)[-1], params), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "NeisServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+class FakeLecture(NamedTuple):
+    period: int
+    subject: str
+    teacher: str
+
+class FakeLesson(NamedTuple):
+    period: int
+    subject: str
+    teacher: str
+    replaced: bool
+    original: Optional[FakeLecture]
+
+SUBJECTS = [("국어", "김*"), ("수학", "이*"), ("영어", "박*"), ("한국사", "최*"), ("프로그래밍", "정*"), ("자료구조", "강*"), ("체육", "조*"), ("음악", "윤*")]
+SCHOOLS = [
+    [1, "서울", "선린인터넷고", 41896],
+    [1, "서울", "선린중", 41897],
+    [1, "서울", "서울디지털고", 12045],
+    [1, "경기", "경기과학고", 23105],
+    [0, "", "검색결과가 많습니다", 0]
+]
+
+class FakeTimeTable:
+    """pycomcigan.TimeTable과 같은 모양의 시간표 (3학년 11반, 주 5일 7교시)"""
+
+    latency = 0.0
+    calls = 0
+
+    def __init__(self, school_name: str, week_num: int = 0, school_code: Optional[int] = None):
+        FakeTimeTable.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        self.school_name = school_name
+        self.school_code = school_code or 41896
+        self.timetable = [[]] + [
+            [[]] + [
+                [[]] + [
+                    [
+                        FakeLesson(period, *SUBJECTS[(grade + _class + day + period + week_num) % len(SUBJECTS)], replaced=period == 3 and day == 2, original=FakeLecture(period, *SUBJECTS[0]) if period == 3 and day == 2 else None)
+                        for period in range(1, 8)
+                    ]
+                    for day in range(5)
+                ]
+                for _class in range(1, 12)
+            ]
+            for grade in range(1, 4)
+        ]
+
+    def homeroom(self, grade: int, _class: int) -> str:
+        return SUBJECTS[(grade + _class) % len(SUBJECTS)][1]
+
+def fake_get_school_code(school_name: str) -> list[list]:
+    if FakeTimeTable.latency:
+        time.sleep(FakeTimeTable.latency)
+    return [school for school in SCHOOLS if school_name in school[2]] or [SCHOOLS[-1]]
+
+def install_comcigan(latency: float = 0.0):
+    """sys.modules에 가짜 pycomcigan을 넣어 app이 실제 컴시간 대신 사용하도록 함"""
+    FakeTimeTable.latency = latency
+    module = types.ModuleType("pycomcigan")
+    module.TimeTable = FakeTimeTable
+    module.get_school_code = fake_get_school_code
+    sys.modules["pycomcigan"] = module
+
+def install_mongo(url: Optional[str] = None):
+    """url이 없으면 mongomock으로 대체 (mongomock-motor 필요)"""
+    if url:
+        os.environ["MONGODB_URL"] = url
+        return
+
+    from mongomock_motor import AsyncMongoMockClient
+    import app.libs.database
+
+    class MockClient(AsyncMongoMockClient):
+        async def close(self):
+            pass
+
+    os.environ["MONGODB_URL"] = "mongodb://mongomock"
+    app.libs.database.AsyncMongoClient = lambda url, **kwargs: MockClient()
+
+def install(neis_latency: float = 0.0, comcigan_latency: float = 0.0, mongo_url: Optional[str] = None, mongo: bool = True) -> NeisServer:
+    """mongo=False면 install_mongo()는 호출하는 쪽에서 app import 뒤에 따로 호출"""
+    neis_server = NeisServer(latency=neis_latency).start()
+    workdir = tempfile.mkdtemp(prefix="npi-bench-")
+    os.environ.update({
+        "NEIS_API_URL": neis_server.url,
+        "NEIS_API_KEY": "bench",
+        "FCM_TRANSPORT": "fake",
+        "SECRET_KEY": os.getenv("SECRET_KEY", "bench"),
+        "SCHOOL_INDEX_PATH": os.path.join(workdir, "school_index.json"),
+        "SNAPSHOT_PATH": os.getenv("SNAPSHOT_PATH", os.path.join(workdir, "snapshots.sqlite3")),
+        "RATE_LIMIT_BACKEND": "memory",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING")
+    })
+    install_comcigan(comcigan_latency)
+    if mongo:
+        install_mongo(mongo_url)
+    return neis_server
@@ -0,0 +1,216 @@
+"""NPI 엔드포인트 부하 벤치마크
+
+업스트림(NEIS, 컴시간, Mongo, FCM)을 모두 로컬 가짜로 바꾼 뒤 app/main.py의 앱을
+프로세스 안에서(ASGI) 띄우고, 엔드포인트마다 동시 요청을 보내 p50/p95/p99 지연 시간과
+RPS를 JSON으로 저장합니다. 네트워크 없이 실행됩니다 (mongomock-motor 필요).
+
+    python -m bench.run                                  # bench/results.json에 저장
+    python -m bench.run -n 2000 -c 50 --only lunch_day,timetable
+    python -m bench.run --baseline bench/baseline.json   # 이전 결과와 비교, 회귀가 있으면 종료 코드 1
+    python -m bench.run --compare old.json new.json      # 실행 없이 두 결과만 비교
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+
+# 회귀 판단에 사용하는 지표와 방향 (True면 클수록 좋음)
+COMPARED_METRICS = {"p50_ms": False, "p95_ms": False, "p99_ms": False, "rps": True}
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    path: str
+    body: Optional[dict] = None
+    headers: Optional[Callable[[int], dict]] = None
+
+def comment_headers(index: int) -> dict:
+    # 같은 uuid는 30초에 한 번만 쓸 수 있으므로 요청마다 다른 uuid 사용
+    from app.routers.slunch_comment import generate_signature
+    uuid = f"bench-{os.getpid()}-{index}"
+    timestamp = int(time.time() * 1000)
+    return {"x-uuid": uuid, "x-timestamp": str(timestamp), "x-signature": generate_signature(uuid, timestamp, os.environ["SECRET_KEY"])}
+
+def secret_headers(index: int) -> dict:
+    return {"x-secret-key": os.environ["SECRET_KEY"]}
+
+SCHOOL = "school_name=%EC%84%A0%EB%A6%B0%EC%9D%B8%ED%84%B0%EB%84%B7%EA%B3%A0"  # 선린인터넷고
+
+SCENARIOS = [
+    Scenario("root", "GET", "/"),
+    Scenario("lunch_day", "GET", "/snt_lunch?month=3&day=4"),
+    Scenario("lunch_month", "GET", "/snt_lunch?month=3"),
+    Scenario("schedule_month", "GET", "/snt_schedule?month=3"),
+    Scenario("lunch_range_schools", "GET", "/snt_lunch?start=2024-12-01&end=2025-01-31&schools=B10:7010536,B10:7010057,J10:7530000"),
+    Scenario("schedule_year_schools", "GET", "/snt_schedule?start=2024-03-01&end=2025-02-28&schools=B10:7010536,B10:7010057,J10:7530000"),
+    Scenario("timetable", "GET", f"/comcigan/timetable?{SCHOOL}&school_grade=1&school_class=1"),
+    Scenario("school_timetable", "GET", f"/comcigan/school_timetable?{SCHOOL}"),
+    Scenario("classlist", "GET", f"/comcigan/classlist?{SCHOOL}"),
+    Scenario("homeroom", "GET", f"/comcigan/homeroom?{SCHOOL}&school_grade=1&school_class=1"),
+    Scenario("search", "GET", "/comcigan/search?school_name=%EC%84%A0%EB%A6%B0"),  # 선린
+    Scenario("comment_list", "GET", "/slunch_comment?page=1&page_size=10"),
+    Scenario("comment_write", "POST", "/slunch_comment", {"username": "bench", "comment": "맛있어요"}, comment_headers),
+    Scenario("noti_batch", "POST", "/slunch_noti/send_batch", {"notifications": [{"title": "급식", "body": "오늘의 급식", "topics": ["lunch"], "tokens": [f"token-{i}" for i in range(50)]}]}, secret_headers),
+    Scenario("status", "GET", "/status"),
+    Scenario("metrics", "GET", "/metrics")
+]
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "max_ms": round(latencies[-1] * 1000, 3)
+    }
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, warmup: int) -> dict:
+    # 측정 구간은 워밍업 다음 인덱스부터 requests개 (요청마다 다른 인덱스로 헤더를 만듦)
+    counter = iter(range(warmup, warmup + requests))
+    latencies: list[float] = []
+    errors = 0
+
+    async def send(index: int) -> bool:
+        headers = scenario.headers(index) if scenario.headers else None
+        response = await client.request(scenario.method, scenario.path, json=scenario.body, headers=headers)
+        # 라우터는 실패도 200 + success:false로 응답하므로 본문도 확인
+        return response.status_code < 400 and b'"success":false' not in response.content[:32]
+
+    for index in range(warmup):
+        await send(index)
+
+    async def worker():
+        nonlocal errors
+        for index in counter:
+            started = time.perf_counter()
+            ok = await send(index)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run(args) -> dict:
+    from bench import fakes
+    neis_server = fakes.install(args.neis_latency / 1000, args.comcigan_latency / 1000, args.mongo_url)
+    os.environ.setdefault("PREFETCH_ENABLED", "false")
+
+    import httpx
+    from app.main import app
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or scenario.name in args.only]
+    results = {}
+    try:
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for scenario in scenarios:
+                    results[scenario.name] = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+                    print(format_result(scenario.name, results[scenario.name]), file=sys.stderr)
+    finally:
+        neis_server.stop()
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "neis_latency_ms": args.neis_latency,
+            "comcigan_latency_ms": args.comcigan_latency,
+            "mongo": "mongod" if args.mongo_url else "mongomock",
+            "upstream_calls": {"neis": neis_server.calls, "comcigan": fakes.FakeTimeTable.calls}
+        },
+        "results": results
+    }
+
+def format_result(name: str, result: dict) -> str:
+    return f"{name:<18} {result['rps']:>10.1f} rps  p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  p99 {result['p99_ms']:>8.2f}ms  errors {result['errors']}"
+
+def compare(baseline: dict, current: dict, threshold: float, metrics: dict[str, bool] = COMPARED_METRICS) -> list[str]:
+    """결과를 비교해 출력하고, threshold(%)보다 나빠진 항목 목록을 돌려줌"""
+    regressions = []
+    print(f"{'scenario':<18} {'metric':<7} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<18} (new)")
+            continue
+        for metric, higher_is_better in metrics.items():
+            if not base[metric]:
+                continue
+            change = (result[metric] - base[metric]) / base[metric] * 100
+            worse = -change if higher_is_better else change
+            flag = " REGRESSION" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{name}.{metric}")
+            print(f"{name:<18} {metric:<7} {base[metric]:>10.2f} {result[metric]:>10.2f} {change:>+7.1f}%{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="NPI endpoint benchmark with local upstream fakes")
+    parser.add_argument("-n", "--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=10, help="requests per scenario before measuring")
+    parser.add_argument("--only", type=lambda value: set(value.split(",")), help="comma separated scenario names")
+    parser.add_argument("--neis-latency", type=float, default=50, help="simulated NEIS latency (ms)")
+    parser.add_argument("--comcigan-latency", type=float, default=200, help="simulated comcigan latency (ms)")
+    parser.add_argument("--mongo-url", help="use a real mongod instead of mongomock (writes to the slunch database)")
+    parser.add_argument("-o", "--output", default=os.path.join("bench", "results.json"))
+    parser.add_argument("--baseline", help="compare against a previous result file")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two result files without running")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed regression (%%) before failing")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            baseline = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            current = json.load(f)
+        sys.exit(1 if compare(baseline, current, args.threshold) else 0)
+
+    result = asyncio.run(run(args))
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"saved {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, result, args.threshold)
+        if regressions:
+            print(f"regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
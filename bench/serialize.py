@@ -0,0 +1,120 @@
+"""응답 직렬화 마이크로벤치마크 (요청 하나당 CPU 시간)
+
+큰 목록 응답(한 달 급식, 일주일 시간표, 학교 전체 시간표)을 세 가지 경로로 만들어 비교합니다.
+
+- validated: 응답 모델을 만들고 FastAPI처럼 반환 타입으로 검증한 뒤 JSONResponse로 직렬화 (이전 방식)
+- direct: dict를 serialize.dumps로 바로 직렬화해 FastJSONResponse로 응답 (검증 생략)
+- cached: 데이터가 그대로일 때 미리 직렬화해 둔 바이트를 그대로 응답
+
+    python -m bench.serialize
+    python -m bench.serialize -n 200 -o bench/results-serialize.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable
+
+from bench.run import git_revision
+
+PATHS = ("validated", "direct", "cached")
+
+def cpu_per_call(func: Callable[[], bytes], number: int) -> float:
+    """호출 한 번의 CPU 시간 (µs, 세 번 측정 중 최솟값)"""
+    func()
+    best = float("inf")
+    for _ in range(3):
+        started = time.process_time()
+        for _ in range(number):
+            func()
+        best = min(best, time.process_time() - started)
+    return best / number * 1e6
+
+def build_cases() -> dict[str, dict[str, Callable[[], bytes]]]:
+    from bench import fakes
+    neis_server = fakes.install()
+    neis_server.stop()
+
+    from fastapi.responses import JSONResponse
+    from pydantic import TypeAdapter
+
+    from app.libs.neis_store import parse_meal
+    from app.libs.serialize import FastJSONResponse, dumps
+    from app.libs.timetable import WeekTimetable
+    from app.routers.comcigan import ClassInfo, ClassTimetable, SchoolTimetableResponse, TimetableResponse
+    from app.routers.responses import ErrorResponse
+    from app.routers.snt_lunch import LunchData, LunchResponse
+
+    def validated(annotation, build: Callable):
+        # 핸들러가 모델을 만들고, FastAPI가 반환 타입으로 다시 검증한 뒤 직렬화하던 경로
+        adapter = TypeAdapter(annotation | ErrorResponse)
+        return lambda: JSONResponse(adapter.dump_python(adapter.validate_python(build()), mode="json")).body
+
+    meals = [parse_meal(row) for row in fakes.NeisServer().rows["mealServiceDietInfo"]]
+    timetable = WeekTimetable.from_comcigan(fakes.FakeTimeTable("선린인터넷고"))
+    week = timetable.week(1, 1)
+
+    def meal_payload() -> dict:
+        return {"success": True, "data": [{"date": meal.date, "menu": list(meal.menu), "school_code": "7010536"} for meal in meals], "stale": False}
+
+    def week_payload() -> dict:
+        return {"success": True, "data": [[lesson.as_dict() for lesson in day] for day in week], "stale": False}
+
+    def school_payload() -> dict:
+        return {"success": True, "data": [
+            {"grade": grade, "school_class": _class, "homeroom": timetable.homeroom(grade, _class), "timetable": [[lesson.as_dict() for lesson in day] for day in week]}
+            for grade, _class, week in timetable.classes()
+        ], "stale": False}
+
+    cached_meals = dumps(meal_payload())
+    return {
+        f"lunch_month ({len(meals)} meals)": {
+            "validated": validated(LunchResponse, lambda: LunchResponse(success=True, data=[LunchData(date=meal.date, menu=list(meal.menu), school_code="7010536") for meal in meals], stale=False)),
+            "direct": lambda: FastJSONResponse(dumps(meal_payload())).body,
+            "cached": lambda: FastJSONResponse(cached_meals).body
+        },
+        "timetable (1 week)": {
+            "validated": validated(TimetableResponse, lambda: TimetableResponse(success=True, data=[[ClassInfo(**lesson.as_dict()) for lesson in day] for day in week])),
+            "direct": lambda: FastJSONResponse(dumps(week_payload())).body,
+            "cached": lambda: FastJSONResponse(timetable.rendered(("timetable", 1, 1), lambda: dumps(week_payload()))).body
+        },
+        f"school_timetable ({len(timetable.class_list())} classes)": {
+            "validated": validated(SchoolTimetableResponse, lambda: SchoolTimetableResponse(success=True, data=[ClassTimetable(**item) for item in school_payload()["data"]])),
+            "direct": lambda: FastJSONResponse(dumps(school_payload())).body,
+            "cached": lambda: FastJSONResponse(timetable.rendered(("school_timetable", None), lambda: dumps(school_payload()))).body
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="NPI response serialization microbenchmark")
+    parser.add_argument("-n", "--number", type=int, default=1000, help="calls per measurement")
+    parser.add_argument("-o", "--output", default=os.path.join("bench", "results-serialize.json"))
+    args = parser.parse_args()
+
+    from app.libs import serialize
+    cases = build_cases()
+    results = {}
+    print(f"{'payload':<32} {'path':<10} {'cpu/request':>12} {'speedup':>8}", file=sys.stderr)
+    for name, paths in cases.items():
+        outputs = {path: json.loads(func()) for path, func in paths.items()}
+        # 세 경로의 응답 내용이 같아야 비교가 의미 있음
+        assert all(output == outputs["validated"] for output in outputs.values()), name
+
+        results[name] = {}
+        for path in PATHS:
+            results[name][f"{path}_us"] = round(cpu_per_call(paths[path], args.number), 2)
+        for path in PATHS:
+            us = results[name][f"{path}_us"]
+            print(f"{name:<32} {path:<10} {us:>10.2f}µs {results[name]['validated_us'] / us:>7.1f}x", file=sys.stderr)
+
+    output = {
+        "meta": {"revision": git_revision(), "python": sys.version.split()[0], "number": args.number, "json": "orjson" if serialize.orjson is not None else "json"},
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"saved {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
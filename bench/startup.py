@@ -0,0 +1,106 @@
+"""시작 시간 벤치마크 (import + lifespan 시작 + 첫 요청)
+
+라우터 조합(ENABLED_ROUTERS)마다 새 파이썬 프로세스를 띄워 측정하고 중앙값을 JSON으로 저장합니다.
+업스트림은 bench.fakes의 가짜를 사용합니다.
+
+    python -m bench.startup                                   # 전체 + 라우터 하나씩
+    python -m bench.startup -r 10 --routers all snt_lunch,snt_schedule
+    python -m bench.startup --baseline bench/startup-baseline.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench.run import compare, git_revision
+
+PHASES = ("import_ms", "startup_ms", "first_request_ms", "total_ms")
+ROUTER_NAMES = ("comcigan", "snt_lunch", "snt_schedule", "slunch_noti", "slunch_comment", "status")
+
+async def child(path: str) -> dict:
+    # 가짜 업스트림 준비는 측정에서 제외
+    from bench import fakes
+    neis_server = fakes.install(mongo=False)
+    os.environ.setdefault("PREFETCH_ENABLED", "false")
+
+    started = time.perf_counter()
+    from app.main import app
+    imported = time.perf_counter()
+
+    fakes.install_mongo()
+    import httpx
+    try:
+        setup_started = time.perf_counter()
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                response = await client.get(path)
+            answered = time.perf_counter()
+    finally:
+        neis_server.stop()
+
+    # mongomock 교체 시간은 제외하고 합산
+    return {
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - setup_started) * 1000,
+        "first_request_ms": (answered - ready) * 1000,
+        "total_ms": (imported - started + answered - setup_started) * 1000,
+        "status": response.status_code
+    }
+
+def measure(routers: str, path: str, repeat: int) -> dict:
+    env = {**os.environ, "ENABLED_ROUTERS": "" if routers == "all" else routers}
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-m", "bench.startup", "--child", "--path", path],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    result = {phase: round(statistics.median(sample[phase] for sample in samples), 2) for phase in PHASES}
+    result["min_total_ms"] = round(min(sample["total_ms"] for sample in samples), 2)
+    result["status"] = samples[-1]["status"]
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="NPI startup time benchmark")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="fresh processes per router set")
+    parser.add_argument("--routers", nargs="+", default=["all", *ROUTER_NAMES], help="router sets to measure (comma separated, or 'all')")
+    parser.add_argument("--path", default="/", help="path of the first request")
+    parser.add_argument("-o", "--output", default=os.path.join("bench", "results-startup.json"))
+    parser.add_argument("--baseline", help="compare against a previous result file")
+    parser.add_argument("--threshold", type=float, default=10, help="allowed regression (%%) before failing")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(child(args.path))))
+        return
+
+    results = {}
+    for routers in args.routers:
+        results[routers] = measure(routers, args.path, args.repeat)
+        result = results[routers]
+        print(f"{routers:<32} import {result['import_ms']:>8.1f}ms  startup {result['startup_ms']:>7.1f}ms  first request {result['first_request_ms']:>7.1f}ms  total {result['total_ms']:>8.1f}ms", file=sys.stderr)
+
+    output = {
+        "meta": {"revision": git_revision(), "python": sys.version.split()[0], "repeat": args.repeat, "path": args.path},
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+    print(f"saved {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, output, args.threshold, {phase: False for phase in PHASES}):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""테스트는 bench.fakes의 로컬 업스트림(NEIS, 컴시간, Mongo, FCM)을 사용하므로 네트워크 없이 실행됩니다."""
+import asyncio
+import os
+from contextlib import AsyncExitStack
+
+import httpx
+import pytest
+
+from bench import fakes
+
+# app 모듈은 import 시점에 환경 변수를 읽으므로 테스트 모듈보다 먼저 설정
+_neis_server = fakes.install()
+os.environ["PREFETCH_ENABLED"] = "false"
+
+def pytest_sessionfinish(session, exitstatus):
+    _neis_server.stop()
+
+@pytest.fixture
+def neis_server(monkeypatch):
+    """테스트마다 새 NEIS 가짜 서버 (호출 수를 따로 세기 위해)"""
+    server = fakes.NeisServer().start()
+    monkeypatch.setenv("NEIS_API_URL", server.url)
+    yield server
+    server.stop()
+
+@pytest.fixture
+def app_neis_server():
+    """앱의 NEIS 클라이언트가 쓰는 가짜 서버 (테스트가 바꾼 지연/오류 설정은 끝나면 되돌림)"""
+    yield _neis_server
+    _neis_server.latency = 0.0
+    _neis_server.failures = 0
+
+@pytest.fixture(scope="session")
+def loop():
+    # 앱의 전역 객체(asyncio.Lock 등)가 한 이벤트 루프에 묶이므로 앱을 쓰는 테스트는 이 루프에서 실행
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(scope="session")
+def client(loop):
+    """lifespan을 실행한 앱에 요청을 보내는 httpx 클라이언트 (세션 동안 유지)"""
+    from app.main import app
+
+    async def start(stack: AsyncExitStack) -> httpx.AsyncClient:
+        await stack.enter_async_context(app.router.lifespan_context(app))
+        return await stack.enter_async_context(httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test"))
+
+    stack = AsyncExitStack()
+    yield loop.run_until_complete(start(stack))
+    loop.run_until_complete(stack.aclose())
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.libs.cache import TTLCache
+
+def test_concurrent_misses_share_one_loader():
+    cache = TTLCache()
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("key", loader))) for _ in range(5)]
+    threads[0].start()
+    started.wait(1)
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 5
+
+def test_concurrent_async_misses_share_one_loader():
+    cache = TTLCache()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_load("key", loader) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(calls) == 1
+    assert cache.stats()["misses"] == 5
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache()
+
+    def loader():
+        raise RuntimeError("upstream")
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            cache.get_or_load("key", loader)
+
+    assert cache.get_or_load("key", lambda: "value") == "value"
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache(ttl=0.05)
+    cache.set("default", 1)
+    cache.set("long", 2, ttl=60)
+    # 로드된 값에 따라 TTL을 정하는 경우
+    cache.get_or_load("empty", lambda: [], ttl=lambda value: 0.05 if not value else None)
+
+    time.sleep(0.1)
+
+    assert cache.get("default") is None
+    assert cache.get("empty") is None
+    assert cache.get("long") == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # 조회한 키는 가장 최근 것으로 옮겨짐
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get_many(["a", "c"]) == {"a": 1, "c": 3}
+    assert len(cache) == 2
+
+def test_version_changes_on_every_write():
+    cache = TTLCache()
+    versions = [cache.version]
+    cache.set("a", 1)
+    versions.append(cache.version)
+    cache.delete("a")
+    versions.append(cache.version)
+    cache.clear()
+    versions.append(cache.version)
+
+    assert versions == [0, 1, 2, 3]
+    # 조회는 버전을 바꾸지 않음
+    cache.get("a")
+    cache.get_many(["a"])
+    assert cache.version == 3
@@ -0,0 +1,16 @@
+import pytest
+
+from app.routers.comcigan import parse_class_filter
+
+def test_class_filter_is_parsed():
+    assert parse_class_filter("1-1, 2-3,") == {(1, 1), (2, 3)}
+
+@pytest.mark.parametrize("classes", ["1", "1-2-3", "1-", "a-1", "1-1,2"])
+def test_class_filter_requires_grade_and_class(classes):
+    with pytest.raises(ValueError, match="classes는 1-1,1-2 형식이어야 합니다"):
+        parse_class_filter(classes)
+
+def test_invalid_class_filter_is_an_error_response(loop, client):
+    response = loop.run_until_complete(client.get("/comcigan/school_timetable", params={"school_name": "선린인터넷고", "classes": "1"}))
+
+    assert response.json() == {"success": False, "error": "classes는 1-1,1-2 형식이어야 합니다"}
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.libs.comment_cache import CommentCache
+from app.libs.database import async_db
+
+def open_db() -> async_db:
+    # bench.fakes.install_mongo로 mongomock 클라이언트가 열림
+    db = async_db(f"test_{ObjectId()}")
+    db.open("mongodb://mongomock")
+    return db
+
+def new_comment(date: datetime, text: str) -> dict:
+    return {"_id": ObjectId(), "username": "test", "comment": text, "date": date, "uuid": "test"}
+
+def count_version_lookups(db: async_db, delay: float = 0.0) -> dict:
+    lookups = {"count": 0}
+    find_one = db.find_one
+
+    async def counting_find_one(collection_name, query, projection=None):
+        if collection_name == "comment_versions":
+            lookups["count"] += 1
+            await asyncio.sleep(delay)
+        return await find_one(collection_name, query, projection)
+
+    db.find_one = counting_find_one
+    return lookups
+
+def test_version_is_checked_at_most_once_per_ttl():
+    db = open_db()
+    cache = CommentCache(db, mode="versioned", version_ttl=60)
+    lookups = count_version_lookups(db)
+
+    async def main():
+        await cache.load()
+        for _ in range(50):
+            await cache.page(1, 10)
+
+    asyncio.run(main())
+    # load()에서 한 번, 그 뒤로는 TTL 동안 다시 조회하지 않음
+    assert lookups["count"] == 1
+
+def test_concurrent_readers_share_one_version_check_after_ttl():
+    db = open_db()
+    cache = CommentCache(db, mode="versioned", version_ttl=0.2)
+    # 느린 버전 조회 동안 다른 요청이 몰려 들어옴
+    lookups = count_version_lookups(db, delay=0.05)
+
+    async def main():
+        await cache.load()
+        await asyncio.sleep(0.25)
+        return await asyncio.gather(*(cache.page(1, 10) for _ in range(20)))
+
+    pages = asyncio.run(main())
+    assert pages == [[]] * 20
+    # load()에서 한 번, TTL이 지난 뒤 한 번
+    assert lookups["count"] == 2
+
+def test_other_worker_writes_are_seen_after_ttl():
+    db = open_db()
+    reader = CommentCache(db, mode="versioned", version_ttl=0.05)
+    writer = CommentCache(db, mode="versioned", version_ttl=0.05)
+
+    async def main():
+        await reader.load()
+        await writer.load()
+        comment = new_comment(datetime.now(), "다른 워커")
+        await db.insert("comments", comment)
+        await writer.add(comment)
+        before = await reader.page(1, 10)
+        time.sleep(0.06)
+        after = await reader.page(1, 10)
+        return before, after
+
+    before, after = asyncio.run(main())
+    assert before == []
+    assert [comment["comment"] for comment in after] == ["다른 워커"]
+
+def test_add_keeps_feed_order_when_writes_finish_out_of_order():
+    db = open_db()
+    cache = CommentCache(db, mode="local")
+    now = datetime.now().replace(microsecond=0)
+    comments = [new_comment(now - timedelta(seconds=seconds), str(seconds)) for seconds in (3, 2, 1)]
+
+    async def main():
+        await cache.load()
+        # 먼저 시작한 쓰기가 나중에 끝남
+        for comment in (comments[2], comments[0], comments[1]):
+            await db.insert("comments", comment)
+            await cache.add(comment)
+        cached = await cache.page(1, 10)
+        stored = await db.to_list(db.find("comments", {}).sort([("date", -1), ("_id", -1)]))
+        return cached, stored
+
+    cached, stored = asyncio.run(main())
+    assert [comment["comment"] for comment in cached] == ["1", "2", "3"]
+    assert [comment["_id"] for comment in cached] == [comment["_id"] for comment in stored]
@@ -0,0 +1,60 @@
+import asyncio
+import json
+
+from app.libs.comment_stream import CommentHub, LocalBackend, comment_hub
+
+COMMENT = {"id": "1", "username": "test", "comment": "맛있어요", "date": "2024-06-04T12:00:00", "edited": False}
+
+def new_hub(**kwargs) -> CommentHub:
+    hub = CommentHub(LocalBackend(), **kwargs)
+    asyncio.run(hub.open())
+    return hub
+
+def test_events_fan_out_to_every_subscriber():
+    hub = new_hub()
+    subscribers = [hub.subscribe() for _ in range(3)]
+
+    async def main():
+        await hub.publish("created", COMMENT)
+        return [await subscriber.next(1) for subscriber in subscribers]
+
+    frames = asyncio.run(main())
+
+    assert len(set(frames)) == 1
+    event, data = frames[0].strip().split("\n")
+    assert event == "event: created"
+    assert json.loads(data.removeprefix("data: ")) == COMMENT
+
+def test_slow_subscriber_is_dropped_when_queue_fills():
+    hub = new_hub(queue_size=2)
+    slow, fast = hub.subscribe(), hub.subscribe()
+
+    async def main():
+        received = []
+        for index in range(3):
+            await hub.publish("created", {**COMMENT, "id": str(index)})
+            # fast는 바로 읽고 slow는 읽지 않음
+            received.append(await fast.next(1))
+        return received, await slow.next(1)
+
+    received, slow_frame = asyncio.run(main())
+
+    assert len(received) == 3 and all(received)
+    # 큐가 가득 찬 구독자는 밀린 이벤트 대신 종료 표시(None)를 받고 허브에서 빠짐
+    assert slow_frame is None
+    assert hub.subscribers == {fast}
+    assert hub.stats()["dropped"] == 1
+
+def test_subscribe_is_refused_over_the_limit():
+    hub = new_hub(max_subscribers=2)
+    assert hub.subscribe() is not None
+    assert hub.subscribe() is not None
+    assert hub.full
+    assert hub.subscribe() is None
+
+def test_stream_returns_503_when_full(loop, client, monkeypatch):
+    monkeypatch.setattr(comment_hub, "max_subscribers", len(comment_hub.subscribers))
+
+    response = loop.run_until_complete(client.get("/slunch_comment/stream"))
+
+    assert response.status_code == 503
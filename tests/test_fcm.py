@@ -0,0 +1,66 @@
+from app.libs import fcm
+from app.libs.fcm import MAX_BATCH_SIZE, FakeTransport, dispatch
+from bench.run import secret_headers
+
+DATA = {"title": "급식", "body": "오늘의 급식"}
+
+def test_results_are_reported_per_target():
+    transport = FakeTransport(fail_tokens=frozenset({"token-bad"}))
+
+    results = dispatch(transport, DATA, ["lunch", "lunch_grade1"], ["token-ok", "token-bad"])
+
+    assert [(result["target"], result["success"]) for result in results] == [
+        ("topic:lunch", True),
+        ("topic:lunch_grade1", True),
+        ("token:token-ok", True),
+        ("token:token-bad", False)
+    ]
+    assert results[3]["error"] == "Requested entity was not found."
+    assert results[3]["message_id"] is None
+    assert len({result["message_id"] for result in results[:3]}) == 3
+
+def test_targets_are_sent_in_chunks_of_max_batch_size():
+    transport = FakeTransport()
+    topics = [f"topic-{i}" for i in range(MAX_BATCH_SIZE + 1)]
+    tokens = [f"token-{i}" for i in range(MAX_BATCH_SIZE * 2 + 1)]
+
+    results = dispatch(transport, DATA, topics, tokens)
+
+    # 토픽은 Message 목록(send_each), 토큰은 MulticastMessage 한 개씩 기록됨
+    multicasts = [message for message in transport.sent if hasattr(message, "tokens")]
+    assert [len(message.tokens) for message in multicasts] == [MAX_BATCH_SIZE, MAX_BATCH_SIZE, 1]
+    assert len(transport.sent) - len(multicasts) == len(topics)
+    assert len(results) == len(topics) + len(tokens)
+    assert all(result["success"] for result in results)
+
+def test_failed_chunk_is_reported_for_each_target():
+    class FailingTransport(FakeTransport):
+        def send_each_for_multicast(self, message):
+            if message.tokens[0] == f"token-{MAX_BATCH_SIZE}":
+                raise RuntimeError("FCM unavailable")
+            return super().send_each_for_multicast(message)
+
+    tokens = [f"token-{i}" for i in range(MAX_BATCH_SIZE + 2)]
+    results = dispatch(FailingTransport(), DATA, [], tokens)
+
+    # 실패한 두 번째 묶음만 대상별로 실패 처리
+    assert all(result["success"] for result in results[:MAX_BATCH_SIZE])
+    assert [(result["target"], result["error"]) for result in results[MAX_BATCH_SIZE:]] == [
+        (f"token:token-{MAX_BATCH_SIZE}", "FCM unavailable"),
+        (f"token:token-{MAX_BATCH_SIZE + 1}", "FCM unavailable")
+    ]
+
+def test_send_batch_reports_failed_tokens(loop, client, monkeypatch):
+    monkeypatch.setattr(fcm, "transport", FakeTransport(fail_tokens=frozenset({"token-bad"})))
+    body = {"notifications": [
+        {"title": "급식", "body": "오늘의 급식", "tokens": ["token-ok", "token-bad"]},
+        {"title": "알림", "body": "기본 토픽"}
+    ]}
+
+    response = loop.run_until_complete(client.post("/slunch_noti/send_batch", json=body, headers=secret_headers(0)))
+
+    tokens, default = response.json()["data"]
+    assert (tokens["success_count"], tokens["failure_count"]) == (1, 1)
+    assert [result["target"] for result in tokens["results"] if not result["success"]] == ["token:token-bad"]
+    # topics와 tokens가 모두 비어 있으면 lunch 토픽으로 전송
+    assert [result["target"] for result in default["results"]] == ["topic:lunch"]
@@ -0,0 +1,77 @@
+import pytest
+
+from app.libs.neis_store import meal_store
+
+LUNCH = "/snt_lunch?year=2024&month=6"
+# 직렬화 결과가 캐시되므로 stale 응답은 다른 달로 확인
+STALE_LUNCH = "/snt_lunch?year=2024&month=7"
+
+@pytest.fixture
+def rendered_calls(monkeypatch):
+    """급식 핸들러가 실행된 횟수 (stale에 True를 넣으면 스냅샷으로 대신한 응답처럼 만듦)"""
+    calls = {"count": 0, "stale": False}
+    rendered = meal_store.rendered
+
+    async def counting_rendered(schools, start, end, render):
+        calls["count"] += 1
+        body, stale = await rendered(schools, start, end, lambda meals, stale: render(meals, stale or calls["stale"]))
+        return body, stale or calls["stale"]
+
+    monkeypatch.setattr(meal_store, "rendered", counting_rendered)
+    return calls
+
+def test_revalidation_skips_handler_while_data_unchanged(loop, client, rendered_calls):
+    async def main():
+        # 처음 요청은 급식을 가져오면서 캐시 버전을 바꾸므로 그 응답의 ETag로는 건너뛰지 않음
+        await client.get(LUNCH)
+        first = await client.get(LUNCH)
+        etag = first.headers["etag"]
+        revalidated = await client.get(LUNCH, headers={"If-None-Match": etag})
+        calls = rendered_calls["count"]
+
+        # 프리페치 등으로 급식 캐시가 바뀌면 다시 핸들러를 거쳐 확인
+        meal_store.cache.set(("test", "version"), ())
+        changed = await client.get(LUNCH, headers={"If-None-Match": etag})
+        return first, revalidated, calls, changed
+
+    first, revalidated, calls, changed = loop.run_until_complete(main())
+
+    assert first.status_code == 200
+    assert first.headers["cache-control"].startswith("public, max-age=")
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == first.headers["etag"]
+    assert calls == 2
+    assert changed.status_code == 304
+    assert rendered_calls["count"] == 3
+
+def test_error_response_is_not_cached(loop, client):
+    async def main():
+        # month도 start/end도 없으면 실패 응답
+        first = await client.get("/snt_lunch?year=2024")
+        second = await client.get("/snt_lunch?year=2024", headers={"If-None-Match": "*"})
+        return first, second
+
+    first, second = loop.run_until_complete(main())
+
+    assert first.json()["success"] is False
+    assert first.headers["cache-control"] == "no-cache"
+    assert "etag" not in first.headers
+    assert second.status_code == 200
+    assert second.json()["success"] is False
+
+def test_stale_response_is_not_cached(loop, client, rendered_calls):
+    rendered_calls["stale"] = True
+
+    async def main():
+        first = await client.get(STALE_LUNCH)
+        second = await client.get(STALE_LUNCH, headers={"If-None-Match": "*"})
+        return first, second
+
+    first, second = loop.run_until_complete(main())
+
+    assert first.json()["stale"] is True
+    assert first.headers["cache-control"] == "no-cache"
+    assert "etag" not in first.headers
+    assert second.status_code == 200
+    assert rendered_calls["count"] == 2
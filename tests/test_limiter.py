@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app.libs.database import async_db
+from app.libs.limiter import MemoryBackend, MongoBackend, RedisBackend
+
+def mongo_backends(count: int) -> list[MongoBackend]:
+    # mongomock 클라이언트끼리는 데이터를 공유하지 않으므로 워커들이 클라이언트 하나를 같이 사용
+    db = async_db(f"test_{ObjectId()}")
+    db.open("mongodb://mongomock")
+    return [MongoBackend(db) for _ in range(count)]
+
+def redis_backends(count: int, monkeypatch) -> list[RedisBackend]:
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # Lua 스크립트 실행
+    from redis import asyncio as redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis, "from_url", lambda url: fakeredis.FakeAsyncRedis(server=server))
+    return [RedisBackend("redis://fake") for _ in range(count)]
+
+def make_backends(kind: str, count: int, monkeypatch) -> list:
+    if kind == "memory":
+        return [MemoryBackend()]
+    if kind == "mongo":
+        return mongo_backends(count)
+    return redis_backends(count, monkeypatch)
+
+async def opened(backends: list):
+    for backend in backends:
+        await backend.open()
+
+async def closed(backends: list):
+    for backend in backends:
+        await backend.close()
+
+@pytest.mark.parametrize("kind", ["memory", "mongo", "redis"])
+def test_sliding_window(kind, monkeypatch):
+    backend, = make_backends(kind, 1, monkeypatch)
+
+    async def main():
+        await opened([backend])
+        results = [await backend.hit("write:a", 2, 0.2) for _ in range(3)]
+        other = await backend.hit("write:b", 2, 0.2)
+        await asyncio.sleep(0.25)
+        after_window = await backend.hit("write:a", 2, 0.2)
+        await closed([backend])
+        return results, other, after_window
+
+    results, other, after_window = asyncio.run(main())
+    assert results == [True, True, False]
+    assert other
+    assert after_window
+
+@pytest.mark.parametrize("kind", ["mongo", "redis"])
+def test_limit_is_shared_between_workers(kind, monkeypatch):
+    workers = make_backends(kind, 4, monkeypatch)
+
+    async def main():
+        await opened(workers)
+        # 같은 uuid가 여러 워커로 동시에 써도 한 번만 허용
+        results = await asyncio.gather(*[worker.hit("write:shared", 1, 30) for worker in workers for _ in range(5)])
+        await closed(workers)
+        return results
+
+    assert sum(asyncio.run(main())) == 1
+
+def test_put_with_unknown_comment_does_not_charge_write_limit(loop, client):
+    from bench.run import comment_headers
+
+    async def main():
+        created = await client.post("/slunch_comment", json={"username": "test", "comment": "원래 댓글"}, headers=comment_headers(2000))
+        assert created.status_code == 200
+        listed = (await client.get("/slunch_comment?page=1&page_size=100")).json()["data"]
+        comment_id = next(item["id"] for item in listed if item["uuid"] == comment_headers(2000)["x-uuid"])
+
+        headers = comment_headers(2001)
+        unknown = await client.put(f"/slunch_comment/{ObjectId()}", json="수정", headers=headers)
+        invalid = await client.put("/slunch_comment/not-an-id", json="수정", headers=headers)
+        edited = await client.put(f"/slunch_comment/{comment_id}", json="수정", headers=comment_headers(2001))
+        return unknown.status_code, invalid.status_code, edited.status_code
+
+    assert loop.run_until_complete(main()) == (404, 400, 200)
@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from app.libs.metrics import REQUEST_DURATION, REQUESTS_IN_FLIGHT, Metric, MetricsMiddleware
+
+def test_metric_requires_samples():
+    with pytest.raises(TypeError):
+        Metric("npi_test", "test")
+
+def in_flight() -> float:
+    return REQUESTS_IN_FLIGHT._values.get((), 0)
+
+def run_request(content_type: bytes, path: str) -> list[str]:
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        await send({"type": "http.response.body", "body": b"data"})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": path}
+    asyncio.run(MetricsMiddleware(app)(scope, None, send))
+    return [line for line in REQUEST_DURATION.samples() if 'route="unmatched"' in line and line.startswith("npi_http_request_duration_seconds_count")]
+
+def test_event_stream_is_not_recorded():
+    before = run_request(b"application/json", "/json")
+    assert run_request(b"text/event-stream", "/stream") == before
+    assert in_flight() == 0
+
+    # 일반 응답은 그대로 기록
+    assert run_request(b"application/json", "/json") != before
+    assert in_flight() == 0
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from datetime import date
+
+import pytest
+
+from app.libs import neis_store
+from app.libs.neis import NeisClient, NeisUnavailable
+from app.libs.neis_store import DEFAULT_SCHOOL, MonthStore, parse_meal, restore_meal
+
+MEAL_PARAMS = {"ATPT_OFCDC_SC_CODE": "B10", "SD_SCHUL_CODE": "7010536", "MMEAL_SC_CODE": "2"}
+
+async def fetch(client: NeisClient, params: dict, **kwargs) -> list[dict]:
+    try:
+        return await client.get("mealServiceDietInfo", params, **kwargs)
+    finally:
+        await client.close()
+
+def test_get_merges_all_pages_in_order(neis_server):
+    params = {**MEAL_PARAMS, "MLSV_FROM_YMD": "20240301", "MLSV_TO_YMD": "20240531"}
+    expected = asyncio.run(fetch(NeisClient(), params))
+    calls = neis_server.calls
+
+    rows = asyncio.run(fetch(NeisClient(), params, page_size=10))
+
+    assert len(expected) > 30
+    assert rows == expected
+    assert neis_server.calls - calls == -(-len(expected) // 10)
+
+def test_get_retries_server_errors(neis_server):
+    neis_server.failures = 2
+    rows = asyncio.run(fetch(NeisClient(retries=2), {**MEAL_PARAMS, "MLSV_YMD": "20240304"}))
+
+    assert [row["MLSV_YMD"] for row in rows] == ["20240304"]
+    assert neis_server.calls == 3
+
+def test_get_gives_up_after_retries(neis_server, monkeypatch):
+    monkeypatch.setenv("NEIS_API_KEY", "secret-key")
+    neis_server.failures = 3
+    with pytest.raises(NeisUnavailable) as error:
+        asyncio.run(fetch(NeisClient(retries=1), {**MEAL_PARAMS, "MLSV_YMD": "20240304"}))
+    assert neis_server.calls == 2
+    # 오류 메시지에 요청 URL(API 키 포함)이 들어가지 않음
+    assert str(error.value) == "NEIS 500"
+    assert error.value.__cause__ is None and error.value.__suppress_context__
+
+def test_pages_are_fetched_concurrently_within_limit(neis_server):
+    neis_server.latency = 0.05
+    params = {**MEAL_PARAMS, "MLSV_FROM_YMD": "20240101", "MLSV_TO_YMD": "20241231"}
+
+    rows = asyncio.run(fetch(NeisClient(concurrency=3), params, page_size=10))
+
+    # 20페이지 이상을 동시에 가져오되 동시 요청은 concurrency를 넘지 않음
+    assert len(rows) > 200
+    assert neis_server.max_in_flight == 3
+
+@pytest.fixture
+def meal_store(neis_server, monkeypatch):
+    # 이벤트 루프마다 새 클라이언트를 써야 하므로 전역 neis 대신 사용 (테스트 안에서 닫음)
+    monkeypatch.setattr(neis_store, "neis", NeisClient())
+    return MonthStore("mealServiceDietInfo", "test_meals", ("MLSV_FROM_YMD", "MLSV_TO_YMD"), {"MMEAL_SC_CODE": "2"}, parse_meal, restore_meal)
+
+def test_concurrent_requests_share_one_fetch(meal_store, neis_server):
+    neis_server.latency = 0.05
+
+    async def main():
+        results = await asyncio.gather(*[meal_store.range(DEFAULT_SCHOOL, date(2024, 3, 1), date(2024, 3, 31)) for _ in range(50)])
+        await neis_store.neis.close()
+        return results
+
+    results = asyncio.run(main())
+
+    assert neis_server.calls == 1
+    assert all(result == results[0] for result in results)
+    assert len(results[0][0]) > 0
+
+def test_range_fetches_only_missing_months_once(meal_store, neis_server):
+    async def main():
+        await meal_store.range(DEFAULT_SCHOOL, date(2024, 3, 1), date(2024, 3, 31))
+        calls = neis_server.calls
+        # 3월은 캐시에서, 4~5월만 기간 조회 한 번으로 가져옴
+        meals, stale = await meal_store.range(DEFAULT_SCHOOL, date(2024, 3, 15), date(2024, 5, 31))
+        await neis_store.neis.close()
+        return neis_server.calls - calls, meals, stale
+
+    calls, meals, stale = asyncio.run(main())
+
+    assert calls == 1
+    assert not stale
+    assert meals[0].date >= "20240315" and meals[-1].date[:6] == "202405"
+
+def test_upstream_error_does_not_leak_api_key(loop, client, app_neis_server, monkeypatch):
+    monkeypatch.setenv("NEIS_API_KEY", "secret-key")
+    app_neis_server.failures = 100
+
+    # 캐시와 스냅샷이 없는 달을 조회
+    response = loop.run_until_complete(client.get("/snt_lunch?year=2031&month=1"))
+
+    assert response.json() == {"success": False, "error": "NEIS 500"}
+    assert response.headers["cache-control"] == "no-cache"
+
+def test_other_routes_are_served_while_neis_is_slow(loop, client, app_neis_server):
+    app_neis_server.latency = 0.5
+
+    async def main():
+        # 캐시에 없는 달이라 NEIS를 기다림
+        lunch = asyncio.ensure_future(client.get("/snt_lunch?year=2032&month=2"))
+        await asyncio.sleep(0.05)
+        timings = []
+        for _ in range(10):
+            started = time.perf_counter()
+            response = await client.get("/")
+            assert response.status_code == 200
+            timings.append(time.perf_counter() - started)
+        pending = not lunch.done()
+        return timings, pending, await lunch
+
+    timings, pending, lunch = loop.run_until_complete(main())
+
+    # 느린 NEIS 요청이 끝나기 전에 다른 요청이 바로 응답됨
+    assert pending
+    assert max(timings) < 0.1
+    assert lunch.json()["success"] is True
@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+from app.libs import prefetch
+from app.libs.timetable import load_timetable, refresh_timetable, timetable_cache
+from bench.fakes import FakeTimeTable
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    timetable_cache.clear()
+    yield
+    timetable_cache.clear()
+
+@pytest.mark.parametrize("school_code", [None, 41896])
+def test_timetable_job_warms_keys_used_by_requests(school_code):
+    asyncio.run(prefetch.timetable_job(refresh_timetable, "선린인터넷고", school_code)())
+    calls = FakeTimeTable.calls
+
+    # 이름만으로 조회하는 요청과 학교 코드로 조회하는 요청 모두 컴시간을 다시 호출하지 않음
+    for week in (0, 1):
+        load_timetable("선린인터넷고", week)
+        load_timetable("선린인터넷고", week, 41896)
+
+    assert FakeTimeTable.calls == calls
@@ -0,0 +1,27 @@
+import asyncio
+
+from app.libs.scheduler import Scheduler
+
+def test_stop_finishes_when_a_job_swallows_cancellation():
+    started = asyncio.Event()
+
+    async def swallowing_job():
+        # 취소를 다른 예외로 바꿔 버리는 클라이언트 (예: 서버 선택 중인 pymongo)
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            raise RuntimeError("server selection interrupted")
+
+    async def main():
+        scheduler = Scheduler()
+        scheduler.add("swallowing", swallowing_job, interval=0.1)
+        await scheduler.start()
+        await asyncio.wait_for(started.wait(), 1)
+        await asyncio.wait_for(scheduler.stop(), 1)
+        return scheduler.jobs["swallowing"]
+
+    job = asyncio.run(main())
+
+    assert job.runs == 1
+    assert job.last_error == "RuntimeError: server selection interrupted"
@@ -0,0 +1,48 @@
+import os
+
+from app.libs.school_index import SchoolIndex
+
+SCHOOLS = [
+    [1, "서울", "선린인터넷고", 7010536],
+    [2, "서울", "선린중학교", 7010537],
+    [3, "서울", "서나고등학교", 7010538],
+    [4, "서울", "대선고등학교", 7010539]
+]
+
+def names(results: list[list]) -> list[str]:
+    return [school[2] for school in results]
+
+def new_index(tmp_path) -> SchoolIndex:
+    index = SchoolIndex(str(tmp_path / "school_index.json"))
+    index.merge("선", SCHOOLS)
+    return index
+
+def test_complete_syllables_match_whole_syllables(tmp_path):
+    index = new_index(tmp_path)
+    # ㅅㅓㄴ이 "서나"의 ㅅㅓ+ㄴ(ㅏ)에 걸쳐 일치하면 안 됨
+    assert names(index.search("선")) == ["선린인터넷고", "선린중학교", "대선고등학교"]
+
+def test_trailing_jamo_matches_next_syllable(tmp_path):
+    index = new_index(tmp_path)
+    assert names(index.search("선린ㅇ")) == ["선린인터넷고"]
+    assert names(index.search("선ㄹ")) == ["선린인터넷고", "선린중학교"]
+    assert names(index.search("ㅅㄹ")) == ["선린인터넷고", "선린중학교"]
+
+def test_merge_is_saved_on_flush(tmp_path):
+    index = new_index(tmp_path)
+    index.merge("선린", SCHOOLS[:1])
+    assert not os.path.exists(index.path)
+
+    index.flush()
+    reloaded = SchoolIndex(index.path)
+    assert names(reloaded.search("선린")) == ["선린인터넷고", "선린중학교"]
+    assert len(reloaded) == len(SCHOOLS)
+
+def test_truncated_results_are_not_covered(tmp_path):
+    index = SchoolIndex(str(tmp_path / "school_index.json"))
+    # 컴시간은 결과가 너무 많으면 코드 0인 안내 행만 돌려줌
+    index.merge("고", [[0, "", "검색결과가 많습니다", 0]])
+
+    assert index.search("선린인터넷고") is None
+    assert index.search("고") is None
+    assert len(index) == 0
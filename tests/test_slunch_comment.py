@@ -0,0 +1,105 @@
+import asyncio
+import base64
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bson import ObjectId
+
+from app.libs.comment_cache import comment_cache
+from app.libs.database import mongo
+from bench.run import comment_headers
+
+def comment_write(index: int, comment: str = "맛있어요") -> dict:
+    return {"json": {"username": "test", "comment": comment}, "headers": comment_headers(index)}
+
+def test_get_latency_stays_flat_while_post_in_flight(loop, client, monkeypatch):
+    insert = mongo.insert
+
+    async def slow_insert(collection_name, data):
+        # 느린 Mongo 쓰기
+        await asyncio.sleep(0.5)
+        return await insert(collection_name, data)
+
+    monkeypatch.setattr(mongo, "insert", slow_insert)
+    # 캐시 없이 읽기도 Mongo(find/to_list)를 거치도록 함
+    monkeypatch.setattr(comment_cache, "mode", "off")
+    reads = 0
+    to_list = mongo.to_list
+
+    async def counting_to_list(cursor, length=None):
+        nonlocal reads
+        reads += 1
+        return await to_list(cursor, length)
+
+    monkeypatch.setattr(mongo, "to_list", counting_to_list)
+
+    async def timed_get() -> float:
+        started = time.perf_counter()
+        response = await client.get("/slunch_comment?page=1&page_size=10")
+        assert response.status_code == 200
+        return time.perf_counter() - started
+
+    async def main():
+        baseline = [await timed_get() for _ in range(20)]
+        post = asyncio.ensure_future(client.post("/slunch_comment", **comment_write(1000)))
+        await asyncio.sleep(0.05)
+        reads_before = reads
+        during = [await timed_get() for _ in range(20)]
+        in_flight = not post.done()
+        return baseline, during, in_flight, reads - reads_before, await post
+
+    baseline, during, in_flight, during_reads, posted = loop.run_until_complete(main())
+
+    # 쓰기가 끝나기를 기다리지 않고 읽기가 평소와 비슷한 시간에 끝남
+    assert in_flight
+    assert during_reads >= 20
+    assert posted.status_code == 200
+    assert max(during) < 0.25
+    assert statistics.median(during) < statistics.median(baseline) * 3 + 0.01
+
+BOOT_WITHOUT_MONGO = """
+import asyncio
+
+import httpx
+from pymongo.errors import ServerSelectionTimeoutError
+
+async def main():
+    from app.main import app
+    from app.routers import slunch_comment
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            print((await client.get("/status")).status_code)
+        try:
+            await slunch_comment.prepare_storage()
+        except ServerSelectionTimeoutError:
+            print("retry later")
+
+asyncio.run(main())
+"""
+
+def test_app_starts_while_mongo_is_unreachable():
+    # mongomock을 쓰지 않도록 별도 프로세스에서 실제 클라이언트로 실행
+    env = {
+        **os.environ,
+        "ENABLED_ROUTERS": "slunch_comment,status",
+        "MONGODB_URL": "mongodb://127.0.0.1:1/?serverSelectionTimeoutMS=300",
+        "PREFETCH_ENABLED": "false"
+    }
+    result = subprocess.run([sys.executable, "-c", BOOT_WITHOUT_MONGO], env=env, capture_output=True, text=True, timeout=60)
+    # 로그도 stdout으로 나오므로 줄 단위로 확인
+    lines = result.stdout.splitlines()
+    assert "200" in lines, result.stderr
+    assert "retry later" in lines
+    assert "comment_storage_prepare_failed" in result.stdout
+
+def test_cursor_with_timezone_offset_is_rejected(loop, client):
+    raw = f"2024-06-04T12:00:00+09:00|{ObjectId()}"
+    before = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    response = loop.run_until_complete(client.get("/slunch_comment", params={"before": before}))
+
+    assert response.status_code == 400
@@ -0,0 +1,51 @@
+import asyncio
+import sqlite3
+import time
+
+from app.libs.neis_store import DEFAULT_SCHOOL, meal_store
+from app.libs.snapshot import SnapshotStore, snapshots
+
+def test_old_and_excess_rows_are_pruned(tmp_path):
+    path = str(tmp_path / "snapshots.sqlite3")
+    store = SnapshotStore(path, max_age=3600, max_rows=2, prune_interval=0)
+    store.open()
+    for index in range(3):
+        store.save("meals", ["school", index], [index])
+        time.sleep(0.01)
+    store.save("timetables", ["school", 0], [0])
+    store.close()
+
+    # 저장한 지 오래된 행
+    with sqlite3.connect(path) as conn:
+        conn.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?)", ("timetables", '["old",0]', "[0]", time.time() - 7200))
+
+    store.open()
+    try:
+        # 네임스페이스마다 최근 max_rows개만 남음
+        assert sorted(key for key, _, _ in store.load("meals")) == [["school", 1], ["school", 2]]
+        assert [key for key, _, _ in store.load("timetables")] == [["school", 0]]
+    finally:
+        store.close()
+
+def test_snapshot_is_served_during_upstream_outage(loop, client, app_neis_server):
+    url = "/snt_lunch?year=2033&month=3"
+
+    async def main():
+        fresh = await client.get(url)
+        # 스냅샷 쓰기는 별도 스레드에서 커밋됨
+        for _ in range(100):
+            if snapshots.get(meal_store.namespace, [*DEFAULT_SCHOOL, "203303"]) is not None:
+                break
+            await asyncio.sleep(0.01)
+
+        meal_store.cache.clear()
+        app_neis_server.failures = 100
+        return fresh, await client.get(url)
+
+    fresh, stale = loop.run_until_complete(main())
+
+    assert fresh.json()["stale"] is False
+    assert stale.json()["stale"] is True
+    assert stale.json()["data"] == fresh.json()["data"]
+    assert stale.headers["cache-control"] == "no-cache"
+    assert "etag" not in stale.headers
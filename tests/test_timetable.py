@@ -0,0 +1,65 @@
+import types
+
+import pytest
+
+from app.libs.timetable import Lesson, OriginalLesson, WeekTimetable
+from bench.fakes import FakeLesson, FakeTimeTable
+
+def test_index_zero_entries_are_dropped():
+    timetable = WeekTimetable.from_comcigan(FakeTimeTable("선린인터넷고"))
+
+    # 컴시간 응답의 0번째 학년/반/요일은 빈 배열
+    assert timetable.grades() == {1, 2, 3}
+    assert len(timetable.class_list()) == 33
+    assert timetable.class_list()[0] == "1-1"
+    week = timetable.week(1, 1)
+    assert len(week) == 5
+    assert [lesson.period for lesson in week[0]] == list(range(1, 8))
+
+def test_conversion_is_immutable_and_detached_from_source():
+    source = FakeTimeTable("선린인터넷고")
+    timetable = WeekTimetable.from_comcigan(source)
+    week = timetable.week(1, 1)
+    content_hash = timetable.content_hash
+
+    assert isinstance(week, tuple) and all(isinstance(day, tuple) for day in week)
+    assert all(type(lesson) is Lesson for day in week for lesson in day)
+    replaced = week[2][2]
+    assert replaced.replaced and type(replaced.original) is OriginalLesson
+    with pytest.raises(AttributeError):
+        replaced.subject = "수정"
+
+    # 원본을 바꿔도 변환된 시간표와 해시는 그대로
+    source.timetable[1][1][1][0] = FakeLesson(1, "수정", "수정", False, None)
+    assert timetable.week(1, 1) is week
+    assert week[0][0].subject != "수정"
+    assert timetable.content_hash == content_hash
+
+def test_empty_classes_are_skipped():
+    source = types.SimpleNamespace(
+        school_name="빈학교",
+        school_code=1,
+        timetable=[[], [[], [], [[], (FakeLesson(1, "국어", "김*", False, None),)]]],
+        homeroom=lambda grade, _class: "김*"
+    )
+    timetable = WeekTimetable.from_comcigan(source)
+
+    # 수업이 없는 반(빈 배열)은 목록에서 빠짐
+    assert timetable.class_list() == ["1-2"]
+    assert timetable.week(1, 2) == ((Lesson(1, "국어", "김*", False, None),),)
+    with pytest.raises(ValueError):
+        timetable.week(1, 1)
+    assert timetable.homeroom(1, 1) == ""
+
+    empty = WeekTimetable.from_comcigan(types.SimpleNamespace(timetable=[[]], homeroom=None))
+    assert (empty.school_name, empty.school_code, empty.class_list(), empty.grades()) == ("", 0, [], set())
+
+def test_snapshot_round_trip():
+    timetable = WeekTimetable.from_comcigan(FakeTimeTable("선린인터넷고"))
+
+    restored = WeekTimetable.from_snapshot(timetable.to_snapshot(), stale=True)
+
+    assert restored.stale and not timetable.stale
+    assert restored.content_hash == timetable.content_hash
+    assert restored.week(2, 3) == timetable.week(2, 3)
+    assert restored.homeroom(2, 3) == timetable.homeroom(2, 3)